@@ -0,0 +1,69 @@
+"""Hindi text for the offline benchmarks.
+
+``SAMPLE_TEXTS`` are the sample paragraphs listed in ``utils/grammar_checker.py``.
+``build_corpus`` adds seeded, template-generated sentences (with the same kinds
+of agreement and spelling mistakes) so runs are large and reproducible.
+"""
+import random
+from typing import List
+
+SAMPLE_TEXTS = [
+    "राम और सीता बाजार गया। वे सब्जी खरीदा और घर आये। बच्चे खेल रहा है। मुजे उनका किताब चाहिए था।",
+    "लड़की स्कूल गया। उसने अपना काम किया। टीचर बहुत खुश था। सब बच्चा अच्छा है।",
+    "मैं कल दिल्ली जा। वह खाना खा। हम फिल्म देख। तुम कहा रहते?",
+    "वह लड़का को पुस्तक दिया। मै आप से मिलना चाहता हु। राधा का घर मे है। यह बहुत सुंदर किताब है।",
+    "आज मौसम बहुत अच्छा है। मैं पार्क मे गया और दोस्तो से मिला। हमने क्रिकेट खेला और बहुत मजा आया। "
+    "शाम को हम सब घर आ गया। मुजे आज का दिन बहुत पसंद आई।",
+    "मै जा रहा हु। तुम कहा हो? वह अच्छा लड़का है। किताब मेज पर है।",
+    "प्रधानमंत्री ने देश को संबोधित किया। उन्होने कहा कि हमे मिलकर काम करना चाहिए। "
+    "सरकार नए योजना शुरू करेगी। यह देश के विकास के लिए बहुत जरुरी है।",
+]
+
+# Common misspellings in the samples; the tiny benchmark dictionary leaves them out
+MISSPELLINGS = {"मुजे", "हु", "मे", "मै", "दोस्तो", "उन्होने", "हमे", "जरुरी", "कहा"}
+
+_SUBJECTS = ["राम", "सीता", "लड़का", "लड़की", "बच्चे", "टीचर", "मेरा दोस्त", "वह", "हम", "मै", "मैं", "राधा", "सरकार"]
+_PLACES = ["बाजार", "स्कूल", "दिल्ली", "पार्क मे", "घर", "दफ्तर", "गाँव", "मंदिर", "अस्पताल"]
+_OBJECTS = ["किताब", "सब्जी", "खाना", "फिल्म", "क्रिकेट", "पुस्तक", "चिट्ठी", "काम", "योजना"]
+_VERBS = ["गया", "गई", "गए", "खरीदा", "देखा", "खेला", "लिखी", "पढ़ा", "किया", "जा रहा हु", "खा रही है", "आये"]
+_ADVERBS = ["आज", "कल", "शाम को", "सुबह", "बहुत जल्दी", "फिर से", "अक्सर"]
+_CONNECTORS = ["और", "लेकिन", "क्योंकि", "फिर", "इसलिए"]
+_ENDINGS = ["।", "।", "।", "?", "!"]
+
+
+def _clause(rng: random.Random) -> str:
+    words = []
+    if rng.random() < 0.5:
+        words.append(rng.choice(_ADVERBS))
+    words.append(rng.choice(_SUBJECTS))
+    if rng.random() < 0.5:
+        words.append(rng.choice(_PLACES))
+    else:
+        words.append(rng.choice(_OBJECTS))
+    words.append(rng.choice(_VERBS))
+    return " ".join(words)
+
+
+def generate_sentence(rng: random.Random, max_clauses: int = 4) -> str:
+    """One sentence of 1..max_clauses clauses joined by connectors"""
+    clauses = [_clause(rng) for _ in range(rng.randint(1, max_clauses))]
+    sentence = clauses[0]
+    for clause in clauses[1:]:
+        sentence += f" {rng.choice(_CONNECTORS)} {clause}"
+    return sentence + rng.choice(_ENDINGS)
+
+
+def sample_sentences() -> List[str]:
+    """The sample paragraphs split into sentences"""
+    from utils.segmenter import sentence_spans
+
+    return [span.text for text in SAMPLE_TEXTS for span in sentence_spans(text)]
+
+
+def build_corpus(size: int = 512, seed: int = 0) -> List[str]:
+    """The sample sentences followed by generated ones, ``size`` sentences in total"""
+    rng = random.Random(seed)
+    sentences = sample_sentences()[:size]
+    while len(sentences) < size:
+        sentences.append(generate_sentence(rng))
+    return sentences
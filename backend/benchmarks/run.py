@@ -0,0 +1,298 @@
+"""Offline per-stage benchmarks for the grammar and paraphrase pipelines.
+
+Runs the stages of ``HindiGrammarChecker.check_text`` and
+``Paraphraser.paraphrase_batch`` one at a time over a fixed corpus, bypassing
+the correction cache, and reports per-batch latency (p50/p95) and throughput
+for each stage at every batch size. Save a run with ``--output`` and pass it to
+a later run with ``--compare`` to see the change.
+
+Usage (from backend/):
+    python -m benchmarks.run                                  # tiny random model
+    python -m benchmarks.run --model sarthak2314/indicbart-hindi-gec-v1 \\
+        --hunspell-dic data/hi_IN.dic --hunspell-aff data/hi_IN.aff
+    python -m benchmarks.run --batch-sizes 1,8 --output before.json
+    python -m benchmarks.run --batch-sizes 1,8 --compare before.json
+    python -m benchmarks.run --profile fast
+
+Decoding settings come from the named profile in ``utils.decoding``
+(``quality`` by default), with the same input-length cap on ``max_length``
+that the endpoints apply.
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+import torch
+
+from benchmarks.corpus import build_corpus
+from benchmarks.tiny_model import DEFAULT_TINY_DIR, ensure_tiny_model
+from utils.decoding import DECODING_PROFILES, get_decoding_params
+from utils.decoding_budget import adaptive_max_length
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+GRAMMAR_STAGES = [
+    "segmentation", "check_spelling", "tokenize", "generate", "decode",
+    "find_grammar_errors", "calculate_stats",
+]
+PARAPHRASE_STAGES = ["tokenize", "generate", "decode"]
+
+
+class StageTimer:
+    """Collects wall-clock seconds and item counts per stage"""
+
+    def __init__(self):
+        self.seconds: Dict[str, List[float]] = defaultdict(list)
+        self.items: Dict[str, int] = defaultdict(int)
+
+    def run(self, stage: str, items: int, fn: Callable, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.seconds[stage].append(time.perf_counter() - started)
+        self.items[stage] += items
+        return result
+
+    def summary(self, stages: List[str]) -> Dict[str, dict]:
+        report = {}
+        for stage in stages:
+            samples = self.seconds.get(stage)
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            total = sum(samples)
+            report[stage] = {
+                "calls": len(samples),
+                "p50_ms": round(statistics.median(ordered) * 1000, 3),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+                "total_s": round(total, 4),
+                "items_per_s": round(self.items[stage] / total, 1) if total > 0 else None,
+            }
+        return report
+
+
+def batches(sentences: List[str], batch_size: int) -> List[List[str]]:
+    return [sentences[i:i + batch_size] for i in range(0, len(sentences), batch_size)]
+
+
+def bench_grammar(checker, sentences: List[str], batch_size: int, decoding_params: dict, timer: StageTimer):
+    """One pass of the grammar pipeline over ``sentences``; each batch is one document"""
+    from utils.segmenter import sentence_spans
+
+    if checker.speller is not None:
+        checker.speller.spell.cache_clear()
+        checker.speller.suggest.cache_clear()
+
+    for batch in batches(sentences, batch_size):
+        text = " ".join(batch)
+        spans = timer.run("segmentation", len(batch), sentence_spans, text)
+        errors = []
+        if checker.speller is not None:
+            errors.extend(timer.run("check_spelling", len(spans), checker.check_spelling, text, spans))
+
+        # Same tokenization and generate call as get_corrected_batch, minus the cache
+        def tokenize():
+            encoded = checker.tokenizer(
+                [f"{span.text} </s> <2hi>" for span in spans], max_length=128, truncation=True
+            )["input_ids"]
+            return checker.tokenizer.pad({"input_ids": encoded}, return_tensors="pt").to(checker.device)
+
+        inputs = timer.run("tokenize", len(spans), tokenize)
+        params = dict(
+            decoding_params,
+            max_length=adaptive_max_length(inputs["input_ids"].shape[1], decoding_params["max_length"]),
+        )
+        with torch.no_grad():
+            output_ids = timer.run(
+                "generate", len(spans), checker.model.generate,
+                inputs["input_ids"], attention_mask=inputs["attention_mask"], **params
+            )
+        corrected = timer.run("decode", len(spans), checker.tokenizer.batch_decode, output_ids, skip_special_tokens=True)
+
+        def diff():
+            return [
+                error for span, fixed in zip(spans, corrected)
+                for error in checker.find_grammar_errors(span.text, fixed)
+            ]
+
+        errors.extend(timer.run("find_grammar_errors", len(spans), diff))
+        timer.run("calculate_stats", 1, checker.calculate_stats, text, errors)
+
+
+def bench_paraphrase(paraphraser, sentences: List[str], batch_size: int, generate_kwargs: dict, timer: StageTimer):
+    """One pass of the paraphrase pipeline over ``sentences``"""
+    for batch in batches(sentences, batch_size):
+        inputs = timer.run("tokenize", len(batch), paraphraser.tokenize_batch, batch)
+        params = dict(
+            generate_kwargs,
+            max_length=adaptive_max_length(inputs.input_ids.shape[1], generate_kwargs["max_length"]),
+        )
+        with torch.no_grad():
+            output_ids = timer.run(
+                "generate", len(batch), paraphraser.generate_output_token,
+                inputs.input_ids, attention_mask=inputs.attention_mask, **params
+            )
+        timer.run("decode", len(batch), paraphraser.decode_batch, output_ids)
+
+
+def load_grammar_checker(args):
+    from utils.grammar_checker import HindiGrammarChecker
+
+    if importlib.util.find_spec("hunspell") is None:
+        logger.warning("hunspell is not installed; check_spelling will not be measured")
+        return _ModelOnlyChecker(args.model)
+    return HindiGrammarChecker(
+        args.model, args.hunspell_dic, args.hunspell_aff,
+        spelling_backend=args.spelling_backend, inference_backend=args.inference_backend,
+    )
+
+
+class _ModelOnlyChecker:
+    """The model-side pieces of HindiGrammarChecker, for machines without Hunspell"""
+
+    def __init__(self, model_path: str):
+        from transformers import AlbertTokenizer
+        from utils.grammar_checker import HindiGrammarChecker
+        from utils.inference_backend import load_seq2seq_model
+
+        self.speller = None
+        self.device = "cpu"
+        self.tokenizer = AlbertTokenizer.from_pretrained(model_path, do_lower_case=False, use_fast=False, keep_accents=True)
+        self.model = load_seq2seq_model(model_path, "eager", self.device)
+        # The diff and scoring stages only use the instance for helper methods
+        self._checker = HindiGrammarChecker.__new__(HindiGrammarChecker)
+        self.find_grammar_errors = self._checker.find_grammar_errors
+        self.calculate_stats = self._checker.calculate_stats
+
+
+def decoding_params_for(args, task: str) -> dict:
+    """The profile's generate() settings for ``task``, with any command-line overrides"""
+    params = get_decoding_params(args.profile, task)
+    if args.num_beams is not None:
+        params["num_beams"] = args.num_beams
+    if args.max_length is not None:
+        params["max_length"] = args.max_length
+    return params
+
+
+def run(args) -> dict:
+    torch.manual_seed(0)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    sentences = build_corpus(args.sentences, seed=args.seed)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    results = {
+        "config": {
+            "model": args.model,
+            "inference_backend": args.inference_backend,
+            "sentences": len(sentences),
+            "batch_sizes": batch_sizes,
+            "repeats": args.repeats,
+            "profile": args.profile,
+            "grammar_decoding": decoding_params_for(args, "grammar"),
+            "paraphrase_decoding": decoding_params_for(args, "paraphrase"),
+            "torch_threads": torch.get_num_threads(),
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "grammar": {},
+        "paraphrase": {},
+    }
+    pipelines = args.pipelines.split(",")
+
+    if "grammar" in pipelines:
+        checker = load_grammar_checker(args)
+        params = decoding_params_for(args, "grammar")
+        bench_grammar(checker, sentences[:batch_sizes[0]], batch_sizes[0], params, StageTimer())  # warm-up
+        for batch_size in batch_sizes:
+            timer = StageTimer()
+            for _ in range(args.repeats):
+                bench_grammar(checker, sentences, batch_size, params, timer)
+            results["grammar"][str(batch_size)] = timer.summary(GRAMMAR_STAGES)
+            logger.info(f"grammar batch={batch_size} done")
+
+    if "paraphrase" in pipelines:
+        from utils.paraphraser import Paraphraser
+
+        paraphraser = Paraphraser(inference_backend=args.inference_backend, model_name=args.model)
+        params = decoding_params_for(args, "paraphrase")
+        bench_paraphrase(paraphraser, sentences[:batch_sizes[0]], batch_sizes[0], params, StageTimer())  # warm-up
+        for batch_size in batch_sizes:
+            timer = StageTimer()
+            for _ in range(args.repeats):
+                bench_paraphrase(paraphraser, sentences, batch_size, params, timer)
+            results["paraphrase"][str(batch_size)] = timer.summary(PARAPHRASE_STAGES)
+            logger.info(f"paraphrase batch={batch_size} done")
+
+    return results
+
+
+def print_report(results: dict, baseline: dict = None):
+    for pipeline in ("grammar", "paraphrase"):
+        for batch_size, stages in results[pipeline].items():
+            print(f"\n{pipeline}  batch={batch_size}")
+            print(f"  {'stage':<20}{'p50 ms':>10}{'p95 ms':>10}{'items/s':>12}" + (f"{'Δ items/s':>12}" if baseline else ""))
+            for stage, row in stages.items():
+                line = f"  {stage:<20}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['items_per_s'] or 0:>12.1f}"
+                if baseline:
+                    before = baseline.get(pipeline, {}).get(batch_size, {}).get(stage, {}).get("items_per_s")
+                    if before and row["items_per_s"]:
+                        line += f"{(row['items_per_s'] / before - 1) * 100:>+11.1f}%"
+                    else:
+                        line += f"{'n/a':>12}"
+                print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="tiny", help="model path or hub id; 'tiny' builds a random stand-in")
+    parser.add_argument("--tiny-dir", default=DEFAULT_TINY_DIR)
+    parser.add_argument("--hunspell-dic", default=None, help="defaults to the tiny model's dictionary")
+    parser.add_argument("--hunspell-aff", default=None)
+    parser.add_argument("--spelling-backend", default="symspell")
+    parser.add_argument("--inference-backend", default="eager")
+    parser.add_argument("--pipelines", default="grammar,paraphrase")
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--sentences", type=int, default=256, help="corpus size (samples first, then generated)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--profile", default="quality", choices=sorted(DECODING_PROFILES))
+    parser.add_argument("--num-beams", type=int, default=None, help="override the profile's num_beams")
+    parser.add_argument("--max-length", type=int, default=None, help="override the profile's max_length")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier run to compare throughput against")
+    args = parser.parse_args(argv)
+
+    if args.model == "tiny":
+        args.model = ensure_tiny_model(args.tiny_dir)
+        args.hunspell_dic = args.hunspell_dic or os.path.join(args.model, "hi_IN.dic")
+        args.hunspell_aff = args.hunspell_aff or os.path.join(args.model, "hi_IN.aff")
+    elif "grammar" in args.pipelines and not (args.hunspell_dic and args.hunspell_aff):
+        parser.error("--hunspell-dic and --hunspell-aff are required with a real model")
+
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
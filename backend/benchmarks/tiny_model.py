@@ -0,0 +1,88 @@
+"""Build a tiny, randomly initialized stand-in for the grammar/paraphrase models.
+
+It has the same architecture as IndicBART (MBart encoder-decoder, SentencePiece
+``AlbertTokenizer`` with ``<2xx>`` language tags) but only tens of thousands of parameters,
+so the benchmarks run anywhere without downloading the real checkpoints. Its
+output is meaningless; only timings (and their relative changes) matter.
+
+Usage (from backend/):  python -m benchmarks.tiny_model /tmp/vakhya-tiny-model
+"""
+import logging
+import os
+import sys
+import tempfile
+
+from benchmarks.corpus import MISSPELLINGS, SAMPLE_TEXTS, build_corpus
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+DEFAULT_TINY_DIR = os.path.join(tempfile.gettempdir(), "vakhya-tiny-model")
+LANGUAGE_TAGS = ["<2hi>", "<2as>", "<2bn>", "<2gu>", "<2kn>", "<2ml>", "<2mr>", "<2or>", "<2pa>", "<2ta>", "<2te>"]
+AFF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "hi_IN.aff")
+
+
+def build_tiny_model(out_dir: str = DEFAULT_TINY_DIR, vocab_size: int = 256, seed: int = 0) -> str:
+    """Write tokenizer, model and a Hunspell .dic/.aff pair to ``out_dir``; returns ``out_dir``"""
+    import sentencepiece as spm
+    import torch
+    from transformers import AlbertTokenizer, AutoModelForSeq2SeqLM, MBartConfig
+
+    os.makedirs(out_dir, exist_ok=True)
+    corpus = build_corpus(2000, seed=seed) + SAMPLE_TEXTS
+    corpus_path = os.path.join(out_dir, "corpus.txt")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(corpus))
+
+    spm.SentencePieceTrainer.train(
+        input=corpus_path,
+        model_prefix=os.path.join(out_dir, "spm"),
+        vocab_size=vocab_size,
+        character_coverage=1.0,
+        hard_vocab_limit=False,
+        user_defined_symbols=LANGUAGE_TAGS,
+        pad_id=0, unk_id=1, bos_id=2, eos_id=3,
+        pad_piece="<pad>", unk_piece="<unk>", bos_piece="<s>", eos_piece="</s>",
+        minloglevel=2,
+    )
+    tokenizer = AlbertTokenizer(
+        vocab_file=os.path.join(out_dir, "spm.model"),
+        do_lower_case=False, keep_accents=True,
+        bos_token="<s>", eos_token="</s>", pad_token="<pad>", unk_token="<unk>",
+    )
+    tokenizer.save_pretrained(out_dir)
+
+    torch.manual_seed(seed)
+    config = MBartConfig(
+        vocab_size=len(tokenizer),
+        d_model=32,
+        encoder_layers=1, decoder_layers=1,
+        encoder_attention_heads=2, decoder_attention_heads=2,
+        encoder_ffn_dim=64, decoder_ffn_dim=64,
+        max_position_embeddings=1024,
+        pad_token_id=0, bos_token_id=2, eos_token_id=3, decoder_start_token_id=2,
+    )
+    AutoModelForSeq2SeqLM.from_config(config).save_pretrained(out_dir)
+
+    # Every corpus word except the known misspellings, so check_spelling has work to do
+    words = sorted({
+        word.strip("।.!?,") for sentence in corpus for word in sentence.split()
+    } - MISSPELLINGS - {""})
+    with open(os.path.join(out_dir, "hi_IN.dic"), "w", encoding="utf-8") as f:
+        f.write(f"{len(words)}\n" + "\n".join(words) + "\n")
+    with open(AFF_PATH, encoding="utf-8") as src, open(os.path.join(out_dir, "hi_IN.aff"), "w", encoding="utf-8") as dst:
+        dst.write(src.read())
+
+    logger.info(f"Tiny benchmark model written to {out_dir}")
+    return out_dir
+
+
+def ensure_tiny_model(out_dir: str = DEFAULT_TINY_DIR) -> str:
+    """Build the tiny model unless ``out_dir`` already holds one"""
+    if not os.path.exists(os.path.join(out_dir, "config.json")):
+        build_tiny_model(out_dir)
+    return out_dir
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(build_tiny_model(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TINY_DIR))
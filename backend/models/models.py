@@ -7,6 +7,7 @@ from typing import Optional, Dict, List
 class GrammarRequest(BaseModel):
     message: str
     language: str = "hindi"
+    profile: Optional[str] = Field(None, example="balanced")
 
 class GrammarError(BaseModel):
     id: int
@@ -19,6 +20,31 @@ class GrammarError(BaseModel):
 class GrammarResponse(BaseModel):
     errors: List[GrammarError]
     stats: dict
+    profile: Optional[str] = None
+    trace_id: Optional[str] = None
+
+class IncrementalGrammarRequest(BaseModel):
+    document_id: str = Field(..., example="draft-1", description="Client id of the document being edited")
+    message: str
+    language: str = "hindi"
+    profile: Optional[str] = Field(None, example="balanced")
+
+class SentenceResult(BaseModel):
+    index: int
+    start: int
+    end: int
+    original: str
+    corrected: str
+    errors: List[GrammarError]
+
+class IncrementalGrammarResponse(BaseModel):
+    document_id: str
+    errors: List[GrammarError]
+    stats: dict
+    sentences: List[SentenceResult]
+    rechecked: int = Field(..., description="Sentences checked by this call")
+    reused: int = Field(..., description="Sentences reused from the previous version")
+    profile: Optional[str] = None
 
 
 class TokenResponse(BaseModel):
@@ -34,8 +60,36 @@ class UserInfo(BaseModel):
 class ParaphraseRequest(BaseModel):
     message: str = Field(..., example="This is an example sentence.")
     language: str = Field(..., example="Hindi")
+    profile: Optional[str] = Field(None, example="balanced")
 
 class ParaphraseResponse(BaseModel):
     original: str
     paraphrased: str
-    language:str
\ No newline at end of file
+    language:str
+    profile: Optional[str] = None
+    trace_id: Optional[str] = None
+
+class MultiParaphraseRequest(BaseModel):
+    message: str = Field(..., example="यह एक उदाहरण वाक्य है।")
+    languages: List[str] = Field(..., example=["hindi", "tamil", "bengali"])
+    profile: Optional[str] = Field(None, example="balanced")
+
+class MultiParaphraseResponse(BaseModel):
+    original: str
+    paraphrased: Dict[str, str] = Field(..., description="Paraphrase per requested language")
+    languages: List[str]
+    profile: Optional[str] = None
+
+class JobRequest(BaseModel):
+    type: str = Field(..., example="grammar", description="grammar or paraphrase")
+    message: str
+    language: str = "hindi"
+    profile: Optional[str] = Field(None, example="balanced")
+
+class JobStatus(BaseModel):
+    job_id: str
+    type: str
+    status: str
+    total_chunks: int
+    completed_chunks: int
+    error: Optional[str] = None
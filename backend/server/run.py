@@ -1,12 +1,28 @@
-from fastapi import FastAPI, HTTPException, Depends, Cookie, Response, Form
+from fastapi import FastAPI, HTTPException, Depends, Cookie, Request, Response, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import jwt
 import firebase_admin
 from firebase_admin import credentials, auth as firebase_auth
 from google.cloud import firestore
-from utils.paraphraser import Paraphraser
+from utils.paraphraser import LANG_MAPPING, PARAPHRASE_MODEL, Paraphraser
 from utils.grammar_checker import HindiGrammarChecker
+from utils.batching import MicroBatcher
+from utils.inference_queue import InferenceWorker, QueueFullError, PRIORITY_BACKGROUND
+from utils.cache import CorrectionCache
+from utils.segmenter import sentence_spans
+from utils.streaming import SSE_HEADERS, WorkerStream, sse_event
+from utils.jobs import JOB_TYPES, STATUS_COMPLETED, JobManager, JobStore
+from utils.write_behind import WriteBehindQueue
+from utils.quota import QuotaManager
+from utils.user_cache import UserProfileCache
+from utils.model_loader import ModelNotReadyError, ModelSlot
+from utils.incremental import DocumentCheckStore
+from utils.process_pool import InferenceProcessPool
+from utils.revocation import REVOCATION_BACKENDS, FirestoreRevocationStore
+from utils.profiling import RequestProfiler
+from utils.decoding_budget import DeadlineExceededError
+from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as metrics_registry
 
 from utils.utils import (
     set_firestore_client,
@@ -14,13 +30,21 @@ from utils.utils import (
     create_refresh_token,
     verify_access_token,
     verify_refresh_token,
+    revoke_refresh_token,
+    set_revocation_store,
     verify_firebase_token,
     get_or_create_user,
+    get_user_profile,
     check_usage_limit,
-    increment_usage,
-    save_paraphrase_history,
-    save_grammar_history,
+    record_paraphrase,
+    record_grammar_check,
+    resolve_decoding_profile,
+    history_page,
+    get_history_document,
+    snippet,
+    FREE_PLAN_LIMITS,
 )
+from utils.decoding import get_decoding_params
 
 from models.models import (
     GrammarRequest,
@@ -30,18 +54,23 @@ from models.models import (
     UserInfo,
     ParaphraseRequest,
     ParaphraseResponse,
+    MultiParaphraseRequest,
+    MultiParaphraseResponse,
+    JobRequest,
+    JobStatus,
+    IncrementalGrammarRequest,
+    IncrementalGrammarResponse,
+    SentenceResult,
 )
 
-from datetime import datetime, timedelta, timezone
-from typing import Dict,List,Optional
+from typing import List,Optional
 from dotenv import load_dotenv
 import os
 import logging
 from uuid import uuid4
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import time
 import hunspell
-import re
 
 
 # ============================
@@ -73,41 +102,195 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Model output cache shared by grammar and paraphrase; keys include the model
+# id, language and decoding settings. Set CACHE_DB_PATH to add a SQLite tier
+# that survives restarts and is shared between uvicorn workers.
+correction_cache = CorrectionCache(
+    max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS")) if os.getenv("CACHE_TTL_SECONDS") else None,
+    db_path=os.getenv("CACHE_DB_PATH") or None,
+    max_disk_entries=int(os.getenv("CACHE_MAX_DISK_ENTRIES", "500000"))
+)
+
+# Both models are built with the backend chosen here: eager, quantized
+# (dynamic int8, CPU only) or onnx (ONNX Runtime export, kept under
+# ONNX_EXPORT_DIR and reused on the next start)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "eager")
+ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR")
+
+def onnx_dir_for(name: str) -> Optional[str]:
+    return os.path.join(ONNX_EXPORT_DIR, name) if ONNX_EXPORT_DIR else None
+
+# Model and dictionary locations; the Hunspell files default to backend/data
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+GRAMMAR_MODEL_PATH = os.getenv("GRAMMAR_MODEL_PATH", "sarthak2314/indicbart-hindi-gec-v1")
+PARAPHRASE_MODEL_PATH = os.getenv("PARAPHRASE_MODEL_PATH", PARAPHRASE_MODEL)
+HUNSPELL_DIC_PATH = os.getenv("HUNSPELL_DIC_PATH", os.path.join(DATA_DIR, "hi_IN.dic"))
+HUNSPELL_AFF_PATH = os.getenv("HUNSPELL_AFF_PATH", os.path.join(DATA_DIR, "hi_IN.aff"))
+MODEL_RETRY_AFTER_SECONDS = int(os.getenv("MODEL_RETRY_AFTER_SECONDS", "10"))
+
+def build_grammar_checker() -> HindiGrammarChecker:
+    return HindiGrammarChecker(
+        model_path=GRAMMAR_MODEL_PATH,
+        hunspell_dic=HUNSPELL_DIC_PATH,
+        hunspell_aff=HUNSPELL_AFF_PATH,
+        batch_size=int(os.getenv("GRAMMAR_BATCH_SIZE", "8")),
+        cache=correction_cache,
+        spelling_backend=os.getenv("SPELLING_BACKEND", "symspell"),
+        inference_backend=INFERENCE_BACKEND,
+        onnx_dir=onnx_dir_for("grammar")
+    )
+
+def build_paraphraser() -> Paraphraser:
+    return Paraphraser(
+        cache=correction_cache,
+        inference_backend=INFERENCE_BACKEND,
+        onnx_dir=onnx_dir_for("paraphrase"),
+        model_name=PARAPHRASE_MODEL_PATH
+    )
+
+# Models load on background threads once the app is up, so auth, history and
+# health endpoints serve immediately; inference endpoints answer 503 until
+# their model is ready (with the inference pool below they load up front)
+grammar_model = ModelSlot("grammar", build_grammar_checker)
+paraphrase_model = ModelSlot("paraphrase", build_paraphraser)
+
+@app.on_event("startup")
+async def load_models():
+    grammar_model.start()
+    paraphrase_model.start()
+
+# Optional inference process pool. Both models are loaded here and forked
+# into INFERENCE_PROCESSES workers that share the weights read-only, each
+# running INFERENCE_THREADS_PER_PROCESS intra-op threads on its own CPUs
+# (unless INFERENCE_CPU_AFFINITY=0). The fork happens at import, before the
+# Firestore client, cache connections and worker threads below exist, so the
+# app only starts serving once the models are loaded. Use it instead of
+# several uvicorn workers; 0 keeps inference in this process.
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "0"))
+INFERENCE_THREADS_PER_PROCESS = int(os.getenv("INFERENCE_THREADS_PER_PROCESS", "1"))
+INFERENCE_CPU_AFFINITY = os.getenv("INFERENCE_CPU_AFFINITY", "1") == "1"
+
+inference_pool: Optional[InferenceProcessPool] = None
+
+if INFERENCE_PROCESSES > 0:
+    for slot in (grammar_model, paraphrase_model):
+        slot.load()
+    # A model that failed to load stays unavailable (503), as without the pool
+    pool_models = {slot.name: slot.get() for slot in (grammar_model, paraphrase_model) if slot.ready}
+    if pool_models:
+        inference_pool = InferenceProcessPool(
+            pool_models,
+            num_processes=INFERENCE_PROCESSES,
+            threads_per_process=INFERENCE_THREADS_PER_PROCESS,
+            cpu_affinity=INFERENCE_CPU_AFFINITY
+        )
+        inference_pool.start()
+
+@app.on_event("shutdown")
+async def stop_inference_pool():
+    if inference_pool is not None:
+        await asyncio.to_thread(inference_pool.close)
+
 try:
     
     firebase_admin.initialize_app()
     
-    db = firestore.Client(project="bharatwrite-8818b")
+    db = firestore.AsyncClient(project="bharatwrite-8818b")
+    
+    # History and usage writes are acknowledged immediately and committed
+    # in batches by a background flush task
+    history_writer = WriteBehindQueue(
+        db,
+        max_batch_size=int(os.getenv("HISTORY_FLUSH_BATCH_SIZE", "100")),
+        flush_interval=float(os.getenv("HISTORY_FLUSH_INTERVAL_SECONDS", "1.0")),
+        max_pending=int(os.getenv("HISTORY_MAX_PENDING", "10000"))
+    )
+    
+    # User documents for /auth/me and /stats, kept in step with this
+    # process's own writes and re-read every PROFILE_CACHE_TTL_SECONDS
+    profile_cache = UserProfileCache(
+        db,
+        ttl_seconds=float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300")),
+        max_entries=int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
+    )
+    
+    # Plan and usage counters are served from memory (re-read every
+    # QUOTA_TTL_SECONDS) and increments reconciled every QUOTA_RECONCILE_SECONDS
+    quota_manager = QuotaManager(
+        db,
+        FREE_PLAN_LIMITS,
+        ttl_seconds=float(os.getenv("QUOTA_TTL_SECONDS", "60")),
+        reconcile_interval=float(os.getenv("QUOTA_RECONCILE_SECONDS", "5")),
+        profiles=profile_cache
+    )
     
-    set_firestore_client(db)
+    set_firestore_client(db, history_writer, quota_manager, profile_cache)
     
     logger.info("✓ Firebase Admin initialized successfully")
-    logger.info("✓ Firestore client initialized")
+    logger.info("✓ Firestore async client initialized")
 except Exception as e:
     logger.critical(f"Failed to initialize Firebase: {e}", exc_info=True)
     raise RuntimeError("Firebase initialization failed") from e
 
+# Revoked refresh tokens are kept in process memory by default; use
+# REVOCATION_BACKEND=firestore when running several uvicorn workers
+REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "local")
+if REVOCATION_BACKEND not in REVOCATION_BACKENDS:
+    raise ValueError(f"REVOCATION_BACKEND must be one of {', '.join(REVOCATION_BACKENDS)}")
+if REVOCATION_BACKEND == "firestore":
+    set_revocation_store(FirestoreRevocationStore(db))
 
-grammar_checker = None
 
 @app.on_event("startup")
-async def load_grammar_checker():
-    """Load the grammar checker at startup"""
-    global grammar_checker
+async def start_history_writer():
+    history_writer.start()
+    quota_manager.start()
+
+def require_model(slot: ModelSlot):
+    """The slot's model, or a 503 while it is still loading (or failed to load)"""
     try:
-        MODEL_PATH = "sarthak2314/indicbart-hindi-gec-v1"
-        DIC_PATH = "/home/sarthak/Desktop/VakyaShuddhi/backend/data/hi_IN.dic"
-        AFF_PATH = "/home/sarthak/Desktop/VakyaShuddhi/backend/data/hi_IN.aff"
-        
-        grammar_checker = HindiGrammarChecker(
-            model_path=MODEL_PATH,
-            hunspell_dic=DIC_PATH,
-            hunspell_aff=AFF_PATH
+        model = slot.get()
+    except ModelNotReadyError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"The {e.name} model is {e.state}. Please retry shortly.",
+            headers={"Retry-After": str(MODEL_RETRY_AFTER_SECONDS)}
         )
-        logger.info("✓ Grammar checker initialized successfully")
-    except Exception as e:
-        logger.error(f"✗ Failed to load grammar checker: {e}")
-        logger.warning("Grammar checking will use fallback mode")
+    return model
+
+def run_model(slot: ModelSlot, method: str, *args, **kwargs):
+    """Call a model method in the inference pool when it is running, else in this process"""
+    if inference_pool is not None and inference_pool.running:
+        return inference_pool.call(slot.name, method, *args, **kwargs)
+    return getattr(slot.get(), method)(*args, **kwargs)
+
+def iter_model(slot: ModelSlot, method: str, *args, **kwargs):
+    """Like run_model, for generator methods"""
+    if inference_pool is not None and inference_pool.running:
+        return inference_pool.iter_call(slot.name, method, *args, **kwargs)
+    return getattr(slot.get(), method)(*args, **kwargs)
+
+# Per-request profiling for admins (uids listed in ADMIN_UIDS): an
+# "X-Profile: 1" header or "?profile_trace=1" on /grammar_check or /paraphrase
+# runs the inference in this process under cProfile and the PyTorch profiler
+# and saves the traces to PROFILE_DIR; the response carries the trace id
+ADMIN_UIDS = {uid.strip() for uid in os.getenv("ADMIN_UIDS", "").split(",") if uid.strip()}
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+request_profiler = RequestProfiler(PROFILE_DIR)
+
+def profiling_trace_id(http_request: Request, uid: str) -> Optional[str]:
+    """A new trace id when the request asks to be profiled, else None"""
+    flag = http_request.headers.get("X-Profile") or http_request.query_params.get("profile_trace")
+    if not flag or flag.lower() in ("0", "false", "no"):
+        return None
+    if uid not in ADMIN_UIDS:
+        raise HTTPException(status_code=403, detail="Profiling is restricted to admins")
+    return request_profiler.new_trace_id()
+
+def run_profiled(trace_id: str, slot: ModelSlot, method: str, *args, **kwargs):
+    """Call a model method in this process (not the inference pool) under the profilers"""
+    return request_profiler.run(trace_id, getattr(slot.get(), method), *args, **kwargs)
 
 
 # JWT Configuration
@@ -120,17 +303,40 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 15
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-executor = ThreadPoolExecutor(max_workers=4)
+# Paraphrase micro-batching: sentences from concurrent requests that arrive
+# within the wait window share one padded generate call
+PARAPHRASE_BATCH_SIZE = int(os.getenv("PARAPHRASE_BATCH_SIZE", "8"))
+PARAPHRASE_BATCH_WAIT_MS = float(os.getenv("PARAPHRASE_BATCH_WAIT_MS", "5"))
+
+# Grammar inference runs on dedicated threads behind a bounded queue so the
+# event loop stays free; a full queue is answered with 503 + Retry-After
+GRAMMAR_QUEUE_SIZE = int(os.getenv("GRAMMAR_QUEUE_SIZE", "32"))
+GRAMMAR_WORKER_THREADS = int(os.getenv("GRAMMAR_WORKER_THREADS", "1"))
+GRAMMAR_RETRY_AFTER_SECONDS = int(os.getenv("GRAMMAR_RETRY_AFTER_SECONDS", "2"))
+
+# Inference deadlines in seconds (0 = none), counted from when a request
+# arrives: generate stops at the deadline with its best hypotheses so far,
+# and a request whose deadline passes before generation starts gets 504
+GRAMMAR_DEADLINE_SECONDS = float(os.getenv("GRAMMAR_DEADLINE_SECONDS", "10"))
+PARAPHRASE_DEADLINE_SECONDS = float(os.getenv("PARAPHRASE_DEADLINE_SECONDS", "10"))
+
+def request_deadline(seconds: float) -> Optional[float]:
+    return time.monotonic() + seconds if seconds > 0 else None
 
+def deadline_exceeded() -> HTTPException:
+    return HTTPException(status_code=504, detail="The request could not be processed in time. Please retry.")
 
-# In-memory revoked token store (replace with DB/Redis in prod)
-revoked_refresh_tokens: Dict[str, datetime] = {}
+grammar_worker = InferenceWorker(
+    max_queue_size=GRAMMAR_QUEUE_SIZE,
+    # One thread per inference process keeps every process busy
+    num_threads=max(GRAMMAR_WORKER_THREADS, INFERENCE_PROCESSES),
+    name="grammar-worker"
+)
+
+@app.on_event("shutdown")
+async def stop_grammar_worker():
+    await asyncio.to_thread(grammar_worker.close)
 
-# Usage limits
-FREE_PLAN_LIMITS = {
-    "paraphrase": 50,  # per month
-    "grammar": 30      # per month
-}
 
 # ============================
 # Auth Routes
@@ -161,7 +367,7 @@ async def refresh_access_token(refresh_token: Optional[str] = Cookie(None)):
     if not refresh_token:
         raise HTTPException(status_code=401, detail="No refresh token found")
 
-    payload = verify_refresh_token(refresh_token)
+    payload = await verify_refresh_token(refresh_token)
 
     user_data = {
         "uid": payload["sub"],
@@ -181,13 +387,7 @@ async def refresh_access_token(refresh_token: Optional[str] = Cookie(None)):
 async def logout(response: Response, refresh_token: Optional[str] = Cookie(None)):
     """Invalidate refresh token and clear cookie"""
     if refresh_token:
-        try:
-            payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-            jti = payload.get("jti")
-            if jti:
-                revoked_refresh_tokens[jti] = datetime.utcnow()
-        except jwt.PyJWTError:
-            pass  # ignore bad tokens
+        await revoke_refresh_token(refresh_token)
 
     response.delete_cookie("refresh_token")
     return {"message": "Logged out successfully"}
@@ -196,14 +396,11 @@ async def logout(response: Response, refresh_token: Optional[str] = Cookie(None)
 async def get_current_user(payload: dict = Depends(verify_access_token)):
     """Get current user profile"""
     uid = payload['sub']
-    user_ref = db.collection('users').document(uid)
-    user_doc = user_ref.get()
+    user_data = await get_user_profile(uid)
     
-    if not user_doc.exists:
+    if user_data is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user_data = user_doc.to_dict()
-    
     return {
         'uid': uid,
         'email': user_data.get('email'),
@@ -221,123 +418,337 @@ async def protected_route(payload: dict = Depends(verify_access_token)):
 # ============================
 # Paraphraser
 # ============================
-paraphraser = Paraphraser()
+def run_paraphrase_batch(items: List[tuple], **kwargs) -> list:
+    """Paraphrase a micro-batch of (sentence, deadline) items.
+
+    Items whose deadline has already passed fail on their own with
+    DeadlineExceededError. The rest share one generate call, which only stops
+    early once all of their deadlines have passed (never, if one has none), so
+    a request with a short deadline doesn't cut the others' beams short.
+    """
+    now = time.monotonic()
+    results = [
+        DeadlineExceededError("Request deadline passed before generation started")
+        if deadline is not None and deadline <= now else None
+        for _, deadline in items
+    ]
+    live = [i for i, result in enumerate(results) if result is None]
+    if live:
+        deadlines = [items[i][1] for i in live]
+        deadline = None if None in deadlines else max(deadlines)
+        outputs = run_model(paraphrase_model, "paraphrase_batch", [items[i][0] for i in live], deadline=deadline, **kwargs)
+        for i, output in zip(live, outputs):
+            results[i] = output
+    return results
+
+paraphrase_batcher = MicroBatcher(
+    run_paraphrase_batch,
+    max_batch_size=PARAPHRASE_BATCH_SIZE,
+    max_wait_ms=PARAPHRASE_BATCH_WAIT_MS,
+    name="paraphrase-batcher",
+    num_workers=max(1, INFERENCE_PROCESSES)
+)
+
+@app.on_event("shutdown")
+async def stop_paraphrase_batcher():
+    await asyncio.to_thread(paraphrase_batcher.close)
+
+def paraphrase_batch_key(lang_code: str, profile: str) -> tuple:
+    """Batcher key: sentences only share a generate call with identical settings"""
+    return (("lang_code", lang_code),) + tuple(sorted(get_decoding_params(profile, "paraphrase").items()))
+
+async def paraphrase_one(sentence: str, lang_tag: str, batch_key: tuple, deadline: Optional[float] = None) -> str:
+    """Paraphrase one sentence through the micro-batcher and convert its script"""
+    decoded_tokens = await asyncio.wrap_future(
+        paraphrase_batcher.submit((sentence, deadline), key=batch_key)
+    )
+
+    if lang_tag == "hi":
+        return decoded_tokens
+    else:
+        return paraphrase_model.get().translate(decoded_tokens, lang_tag)
+
+def paraphrase_profiled(sentences: List[str], lang_tag: str, lang_code: str, profile: str) -> List[str]:
+    """Paraphrase and transliterate all sentences in one call, bypassing the micro-batcher"""
+    paraphraser = paraphrase_model.get()
+    decoded = paraphraser.paraphrase_batch(sentences, lang_code=lang_code, **get_decoding_params(profile, "paraphrase"))
+    if lang_tag == "hi":
+        return decoded
+    return [paraphraser.translate(sentence, lang_tag) for sentence in decoded]
 
 @app.post("/paraphrase", response_model=ParaphraseResponse)
 async def paraphrase_sentence(
     request: ParaphraseRequest,
+    http_request: Request,
     payload: dict = Depends(verify_access_token)
 ):
     uid = payload['sub']
+    trace_id = profiling_trace_id(http_request, uid)
+    deadline = request_deadline(PARAPHRASE_DEADLINE_SECONDS)
     
     # Check usage limit
-    can_use, remaining = await check_usage_limit(uid, 'paraphrase')
+    can_use, remaining, plan = await check_usage_limit(uid, 'paraphrase')
     if not can_use:
         raise HTTPException(
             status_code=403,
             detail="Monthly limit reached. Upgrade to premium for unlimited access."
         )
+    profile = resolve_decoding_profile(plan, request.profile)
+    require_model(paraphrase_model)
     
     message = request.message.strip()
     language = request.language.strip()
 
-    lang_tag = paraphraser.get_langtag(language)
+    lang_tag = LANG_MAPPING[language]
     lang_code = f"<2{lang_tag}>"
 
     if not message:
         raise HTTPException(status_code=400, detail="Message cannot be empty.")
 
-    sentences = re.findall(r'[^।?!]+[।?!]?', message)
+    sentences = [span.text for span in sentence_spans(message)]
 
-    def process(sentence):
-        input_tokens = paraphraser.tokenize(message=sentence, lang_code=lang_code)
-        output_tokens = paraphraser.generate_output_token(
-            input_tokens, lang_code=lang_code, max_length=256
+    if trace_id:
+        paraphrased_sentences = await asyncio.to_thread(
+            request_profiler.run, trace_id, paraphrase_profiled, sentences, lang_tag, lang_code, profile
         )
-        decoded_tokens = paraphraser.decode_output(output_tokens)
-
-        if lang_tag == "hi":
-            return decoded_tokens
-        else:
-            return paraphraser.translate(decoded_tokens, lang_tag)
-
-    loop = asyncio.get_event_loop()
+    else:
+        batch_key = paraphrase_batch_key(lang_code, profile)
 
-    tasks = [loop.run_in_executor(executor,process,s) for s in sentences if s.strip()]
+        tasks = [paraphrase_one(s, lang_tag, batch_key, deadline) for s in sentences]
 
-    paraphrased_sentences = await asyncio.gather(*tasks)
+        try:
+            paraphrased_sentences = await asyncio.gather(*tasks)
+        except DeadlineExceededError:
+            raise deadline_exceeded()
     
     # Join paraphrased sentences back
     paraphrased = " ".join(paraphrased_sentences)
 
-    await save_paraphrase_history(uid, message, paraphrased, language)
-    await increment_usage(uid, 'paraphrase')
+    await record_paraphrase(uid, message, paraphrased, language)
+    
+    return {
+        "original": message,
+        "paraphrased": paraphrased,
+        "language":language,
+        "profile": profile,
+        "trace_id": trace_id
+    }
+
+@app.post("/paraphrase/multi", response_model=MultiParaphraseResponse)
+async def paraphrase_multi(
+    request: MultiParaphraseRequest,
+    payload: dict = Depends(verify_access_token)
+):
+    """Paraphrase once and return the result in the script of every requested language.
+
+    Each sentence is generated a single time (as Hindi, in Devanagari) and
+    then transliterated to each language's script, so N languages cost one
+    beam search instead of N. Counts as one paraphrase.
+    """
+    uid = payload['sub']
+    
+    languages = list(dict.fromkeys(language.strip() for language in request.languages))
+    if not languages:
+        raise HTTPException(status_code=400, detail="At least one language is required.")
+    unsupported = [language for language in languages if language not in LANG_MAPPING]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Unsupported languages: {', '.join(unsupported)}")
+    
+    can_use, remaining, plan = await check_usage_limit(uid, 'paraphrase')
+    if not can_use:
+        raise HTTPException(
+            status_code=403,
+            detail="Monthly limit reached. Upgrade to premium for unlimited access."
+        )
+    profile = resolve_decoding_profile(plan, request.profile)
+    paraphraser = require_model(paraphrase_model)
+    deadline = request_deadline(PARAPHRASE_DEADLINE_SECONDS)
+    
+    message = request.message.strip()
+    if not message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty.")
+    
+    batch_key = paraphrase_batch_key("<2hi>", profile)
+    try:
+        devanagari_sentences = await asyncio.gather(*[
+            paraphrase_one(span.text, "hi", batch_key, deadline) for span in sentence_spans(message)
+        ])
+    except DeadlineExceededError:
+        raise deadline_exceeded()
+    
+    paraphrased = {}
+    for language in languages:
+        lang_tag = LANG_MAPPING[language]
+        if lang_tag == "hi":
+            paraphrased[language] = " ".join(devanagari_sentences)
+        else:
+            paraphrased[language] = " ".join(paraphraser.translate(s, lang_tag) for s in devanagari_sentences)
+    
+    # History lists the first requested language and keeps every language's text
+    await record_paraphrase(uid, message, paraphrased[languages[0]], languages[0], translations=paraphrased)
     
     return {
         "original": message,
         "paraphrased": paraphrased,
-        "language":language
+        "languages": languages,
+        "profile": profile
     }
 
+@app.post("/paraphrase/stream")
+async def paraphrase_stream(
+    request: ParaphraseRequest,
+    payload: dict = Depends(verify_access_token)
+):
+    """Paraphrase with server-sent events.
+
+    Emits one ``sentence`` event per sentence as soon as it is ready (in
+    completion order, tagged with its index and character offsets), then a
+    ``done`` event with the joined result, or an ``error`` event.
+    """
+    uid = payload['sub']
+    
+    can_use, remaining, plan = await check_usage_limit(uid, 'paraphrase')
+    if not can_use:
+        raise HTTPException(
+            status_code=403,
+            detail="Monthly limit reached. Upgrade to premium for unlimited access."
+        )
+    profile = resolve_decoding_profile(plan, request.profile)
+    require_model(paraphrase_model)
+    deadline = request_deadline(PARAPHRASE_DEADLINE_SECONDS)
+    
+    message = request.message.strip()
+    language = request.language.strip()
+
+    lang_tag = LANG_MAPPING[language]
+    batch_key = paraphrase_batch_key(f"<2{lang_tag}>", profile)
+
+    if not message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty.")
+
+    spans = sentence_spans(message)
+
+    async def process(span):
+        return span, await paraphrase_one(span.text, lang_tag, batch_key, deadline)
+
+    async def events():
+        tasks = [asyncio.ensure_future(process(span)) for span in spans]
+        paraphrased_sentences = [""] * len(spans)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                span, paraphrased_sentence = await next_done
+                paraphrased_sentences[span.index] = paraphrased_sentence
+                yield sse_event("sentence", {
+                    "index": span.index,
+                    "start": span.start,
+                    "end": span.end,
+                    "original": span.text,
+                    "paraphrased": paraphrased_sentence
+                })
+        except Exception as e:
+            logger.error(f"Paraphrase stream error: {e}", exc_info=True)
+            yield sse_event("error", {"detail": str(e)})
+            return
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        paraphrased = " ".join(paraphrased_sentences)
+        await record_paraphrase(uid, message, paraphrased, language)
+
+        yield sse_event("done", {
+            "original": message,
+            "paraphrased": paraphrased,
+            "language": language,
+            "profile": profile
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # ============================
 # History & Stats
 # ============================
 @app.get("/history/paraphrases")
 async def get_paraphrase_history(
     payload: dict = Depends(verify_access_token),
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
-    """Get user's paraphrase history"""
+    """Get a page of the user's paraphrase history (snippets only)"""
     uid = payload['sub']
     
-    paraphrases = db.collection('paraphrases')\
-        .where('userId', '==', uid)\
-        .order_by('createdAt', direction=firestore.Query.DESCENDING)\
-        .limit(limit)\
-        .stream()
-    
-    history = []
-    for doc in paraphrases:
-        data = doc.to_dict()
-        history.append({
-            'id': doc.id,
+    docs, next_cursor = await history_page(
+        'paraphrases', uid, ['paraphrase_id', 'original', 'paraphrased', 'language'], limit, cursor
+    )
+    
+    items = []
+    for doc_id, data in docs:
+        items.append({
+            'id': doc_id,
             'type': 'paraphrase',
-            'activity_id':data['paraphrase_id'],
-            'original': data['original'],
-            'paraphrased': data['paraphrased'],
-            'language': data['language'],
+            'activity_id': data.get('paraphrase_id'),
+            'original': snippet(data.get('original')),
+            'paraphrased': snippet(data.get('paraphrased')),
+            'language': data.get('language'),
             'createdAt': data['createdAt'].isoformat() if data.get('createdAt') else None
         })
     
-    return history
+    return {'items': items, 'next_cursor': next_cursor}
+
+@app.get("/history/paraphrases/{history_id}")
+async def get_paraphrase_detail(history_id: str, payload: dict = Depends(verify_access_token)):
+    """Get one full paraphrase history item"""
+    data = await get_history_document('paraphrases', payload['sub'], history_id)
+    return {
+        'id': history_id,
+        'type': 'paraphrase',
+        'activity_id': data.get('paraphrase_id'),
+        'original': data['original'],
+        'paraphrased': data['paraphrased'],
+        'language': data['language'],
+        'createdAt': data['createdAt'].isoformat() if data.get('createdAt') else None
+    }
 
 @app.get("/history/grammar")
 async def get_grammar_history(
     payload: dict = Depends(verify_access_token),
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
-    """Get user's grammar check history"""
+    """Get a page of the user's grammar check history (snippets and error counts only)"""
     uid = payload['sub']
     
-    checks = db.collection('grammarChecks')\
-        .where('userId', '==', uid)\
-        .order_by('createdAt', direction=firestore.Query.DESCENDING)\
-        .limit(limit)\
-        .stream()
-    
-    history = []
-    for doc in checks:
-        data = doc.to_dict()
-        history.append({
-            'id': doc.id,
+    docs, next_cursor = await history_page(
+        'grammarChecks', uid, ['original', 'errorCount', 'language'], limit, cursor
+    )
+    
+    items = []
+    for doc_id, data in docs:
+        items.append({
+            'id': doc_id,
             'type': 'grammar',
-            'original': data['original'],
-            'errors': data['errors'],
-            'language': data['language'],
+            'original': snippet(data.get('original')),
+            # Checks saved before errorCount was stored report None
+            'errorCount': data.get('errorCount'),
+            'language': data.get('language'),
             'createdAt': data['createdAt'].isoformat() if data.get('createdAt') else None
         })
     
-    return history
+    return {'items': items, 'next_cursor': next_cursor}
+
+@app.get("/history/grammar/{history_id}")
+async def get_grammar_detail(history_id: str, payload: dict = Depends(verify_access_token)):
+    """Get one full grammar check history item, including its errors"""
+    data = await get_history_document('grammarChecks', payload['sub'], history_id)
+    return {
+        'id': history_id,
+        'type': 'grammar',
+        'original': data['original'],
+        'errors': data['errors'],
+        'errorCount': len(data['errors']),
+        'language': data['language'],
+        'createdAt': data['createdAt'].isoformat() if data.get('createdAt') else None
+    }
 
 @app.get("/stats")
 async def get_user_stats(payload: dict = Depends(verify_access_token)):
@@ -345,14 +756,11 @@ async def get_user_stats(payload: dict = Depends(verify_access_token)):
     uid = payload['sub']
     
     # Get user data
-    user_ref = db.collection('users').document(uid)
-    user_doc = user_ref.get()
+    user_data = await get_user_profile(uid)
     
-    if not user_doc.exists:
+    if user_data is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user_data = user_doc.to_dict()
-    
     paraphrase_count = user_data.get('totalParaphrases', 0)
     grammar_count = user_data.get('totalGrammarChecks', 0)
 
@@ -377,10 +785,13 @@ async def get_user_stats(payload: dict = Depends(verify_access_token)):
 @app.post("/grammar_check", response_model=GrammarResponse)
 async def check_grammar(
     request: GrammarRequest,
+    http_request: Request,
     payload: dict = Depends(verify_access_token),
 ):
     """Grammar check with fine-tuned AI model"""
+    deadline = request_deadline(GRAMMAR_DEADLINE_SECONDS)
     try:
+        trace_id = profiling_trace_id(http_request, payload['sub'])
         text = request.message.strip()
         
         if not text:
@@ -394,31 +805,40 @@ async def check_grammar(
         
         # Check usage limits
         uid = payload['sub']
-        can_use, remaining = await check_usage_limit(uid, 'grammar')
+        can_use, remaining, plan = await check_usage_limit(uid, 'grammar')
         if not can_use:
             raise HTTPException(
                 status_code=403,
                 detail="Monthly limit reached. Upgrade to premium for unlimited access."
             )
+        profile = resolve_decoding_profile(plan, request.profile)
         
-        # If model not loaded, fall back to Hunspell only
-        if grammar_checker is None:
-            logger.warning("Grammar checker not available, using Hunspell fallback")
-            errors = grammar_checker.check_spelling(text)  # Your old function
-            stats = grammar_checker.calculate_stats(text, errors)  # Your old function
-        else:
-            # Use the AI model + Hunspell
-            errors, corrected_text = grammar_checker.check_text(text)
-            stats = grammar_checker.calculate_stats(text, errors)
-            logger.info(f"Found {len(errors)} errors. Corrected: {corrected_text[:50]}...")
+        grammar_checker = require_model(grammar_model)
         
-        # Save to history
-        await save_grammar_history(uid, text, [e.dict() for e in errors], request.language)
+        # Use the AI model + Hunspell, off the event loop
+        decoding_params = get_decoding_params(profile, "grammar")
+        try:
+            if trace_id:
+                future = grammar_worker.submit(run_profiled, trace_id, grammar_model, "check_text", text, decoding_params, deadline)
+            else:
+                future = grammar_worker.submit(run_model, grammar_model, "check_text", text, decoding_params, deadline)
+        except QueueFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Grammar checker is busy. Please retry shortly.",
+                headers={"Retry-After": str(GRAMMAR_RETRY_AFTER_SECONDS)}
+            )
+        try:
+            errors, corrected_text = await asyncio.wrap_future(future)
+        except DeadlineExceededError:
+            raise deadline_exceeded()
+        stats = grammar_checker.calculate_stats(text, errors)
+        logger.info(f"Found {len(errors)} errors. Corrected: {corrected_text[:50]}...")
         
-        # Increment usage
-        await increment_usage(uid, 'grammar')
+        # Save to history and increment usage in one batched write
+        await record_grammar_check(uid, text, [e.dict() for e in errors], request.language)
         
-        return GrammarResponse(errors=errors, stats=stats)
+        return GrammarResponse(errors=errors, stats=stats, profile=profile, trace_id=trace_id)
     
     except HTTPException:
         raise
@@ -427,13 +847,431 @@ async def check_grammar(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/grammar_check/stream")
+async def check_grammar_stream(
+    request: GrammarRequest,
+    payload: dict = Depends(verify_access_token),
+):
+    """Grammar check with server-sent events.
+
+    Emits one ``sentence`` event per sentence in document order (index,
+    character offsets, corrected sentence and that sentence's errors), then a
+    ``done`` event with the deduplicated document-level errors and stats, or
+    an ``error`` event.
+    """
+    text = request.message.strip()
+    uid = payload['sub']
+    
+    can_use, remaining, plan = await check_usage_limit(uid, 'grammar')
+    if not can_use:
+        raise HTTPException(
+            status_code=403,
+            detail="Monthly limit reached. Upgrade to premium for unlimited access."
+        )
+    profile = resolve_decoding_profile(plan, request.profile)
+    
+    grammar_checker = require_model(grammar_model)
+    
+    try:
+        stream = WorkerStream(
+            grammar_worker, iter_model, grammar_model, "iter_check_text", text, get_decoding_params(profile, "grammar")
+        )
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Grammar checker is busy. Please retry shortly.",
+            headers={"Retry-After": str(GRAMMAR_RETRY_AFTER_SECONDS)}
+        )
+
+    async def events():
+        all_errors = []
+        try:
+            async for span, errors, corrected_sentence in stream:
+                all_errors.extend(errors)
+                yield sse_event("sentence", {
+                    "index": span.index,
+                    "start": span.start,
+                    "end": span.end,
+                    "original": span.text,
+                    "corrected": corrected_sentence,
+                    "errors": [e.dict() for e in grammar_checker.merge_errors(list(errors))]
+                })
+        except Exception as e:
+            logger.error(f"Grammar stream error: {e}", exc_info=True)
+            yield sse_event("error", {"detail": str(e)})
+            return
+        finally:
+            stream.cancel()
+
+        errors = grammar_checker.merge_errors(all_errors)
+        stats = grammar_checker.calculate_stats(text, errors)
+
+        if text:
+            await record_grammar_check(uid, text, [e.dict() for e in errors], request.language)
+
+        yield sse_event("done", {
+            "errors": [e.dict() for e in errors],
+            "stats": stats,
+            "profile": profile
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# Incremental re-checks keep the per-sentence results of each document's last
+# version (up to INCREMENTAL_MAX_DOCUMENTS documents, each for
+# INCREMENTAL_TTL_SECONDS after its last check) so an edit only re-runs the
+# sentences it touched
+document_checks = DocumentCheckStore(
+    max_documents=int(os.getenv("INCREMENTAL_MAX_DOCUMENTS", "10000")),
+    ttl_seconds=float(os.getenv("INCREMENTAL_TTL_SECONDS", "3600"))
+)
+
+@app.post("/grammar_check/incremental", response_model=IncrementalGrammarResponse)
+async def check_grammar_incremental(
+    request: IncrementalGrammarRequest,
+    payload: dict = Depends(verify_access_token),
+):
+    """Re-check an edited document, running the model only on new or changed sentences.
+
+    Sentences unchanged since the previous call with the same ``document_id``
+    reuse their stored results at their new offsets (character offsets into
+    ``message`` as sent). Usage and history are recorded once per document
+    session, on its first call that had to check a sentence; the session ends
+    when the document is deleted or its stored state expires.
+    """
+    deadline = request_deadline(GRAMMAR_DEADLINE_SECONDS)
+    uid = payload['sub']
+    text = request.message
+    
+    can_use, remaining, plan = await check_usage_limit(uid, 'grammar')
+    if not can_use:
+        raise HTTPException(
+            status_code=403,
+            detail="Monthly limit reached. Upgrade to premium for unlimited access."
+        )
+    profile = resolve_decoding_profile(plan, request.profile)
+    
+    grammar_checker = require_model(grammar_model)
+    
+    spans = sentence_spans(text)
+    results, changed = document_checks.split(uid, request.document_id, profile, spans)
+    truncated = set()
+    
+    if changed:
+        try:
+            future = grammar_worker.submit(
+                run_model, grammar_model, "check_spans", text, changed, get_decoding_params(profile, "grammar"), deadline
+            )
+        except QueueFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Grammar checker is busy. Please retry shortly.",
+                headers={"Retry-After": str(GRAMMAR_RETRY_AFTER_SECONDS)}
+            )
+        try:
+            checked, truncated = await asyncio.wrap_future(future)
+        except DeadlineExceededError:
+            raise deadline_exceeded()
+        results.update({span.index: result for span, result in zip(changed, checked)})
+    
+    ordered = [results[span.index] for span in spans]
+    # Sentences the deadline cut short were not grammar-checked; they are checked again next time
+    document_checks.store(uid, request.document_id, profile, spans, ordered, truncated)
+    document_checks.record(len(changed), len(spans) - len(changed))
+    
+    # merge_errors renumbers in place, so stored errors are copied first
+    sentences = [
+        SentenceResult(
+            index=span.index,
+            start=span.start,
+            end=span.end,
+            original=span.text,
+            corrected=corrected,
+            errors=grammar_checker.merge_errors([e.copy() for e in errors])
+        )
+        for span, (corrected, errors) in zip(spans, ordered)
+    ]
+    errors = grammar_checker.merge_errors([e.copy() for _, sentence_errors in ordered for e in sentence_errors])
+    stats = grammar_checker.calculate_stats(text, errors)
+    
+    if changed and document_checks.claim_billing(uid, request.document_id):
+        await record_grammar_check(uid, text.strip(), [e.dict() for e in errors], request.language)
+    
+    return IncrementalGrammarResponse(
+        document_id=request.document_id,
+        errors=errors,
+        stats=stats,
+        sentences=sentences,
+        rechecked=len(changed),
+        reused=len(spans) - len(changed),
+        profile=profile
+    )
+
+@app.delete("/grammar_check/incremental/{document_id}")
+async def forget_incremental_document(document_id: str, payload: dict = Depends(verify_access_token)):
+    """Drop the stored sentence results of a document (e.g. when its editor closes)"""
+    document_checks.forget(payload['sub'], document_id)
+    return {"message": "Document state cleared"}
+
+
+# ============================
+# Document Jobs
+# ============================
+# Large documents are processed in the background, chunk by chunk, through
+# the same grammar worker (at background priority) and paraphrase batcher.
+# Progress is stored in SQLite so unfinished jobs resume after a restart.
+JOBS_DB_PATH = os.getenv(
+    "JOBS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "jobs.sqlite3")
+)
+JOB_CHUNK_CHARS = int(os.getenv("JOB_CHUNK_CHARS", "1000"))
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "1"))
+JOB_RETRY_SECONDS = float(os.getenv("JOB_RETRY_SECONDS", "1"))
+
+async def process_job_chunk(job: dict, chunk: dict) -> dict:
+    """Run one chunk of a job through the grammar or paraphrase pipeline"""
+    if job["type"] == "grammar":
+        # Jobs resumed at startup wait here until the model has loaded
+        await grammar_model.wait()
+        while True:
+            try:
+                future = grammar_worker.submit(
+                    run_model,
+                    grammar_model,
+                    "check_text",
+                    chunk["text"],
+                    get_decoding_params(job["profile"], "grammar"),
+                    priority=PRIORITY_BACKGROUND
+                )
+                break
+            except QueueFullError:
+                # Interactive traffic has the queue; back off instead of failing
+                await asyncio.sleep(JOB_RETRY_SECONDS)
+        errors, corrected_text = await asyncio.wrap_future(future)
+        return {"errors": [e.dict() for e in errors], "corrected": corrected_text}
+
+    await paraphrase_model.wait()
+    lang_tag = LANG_MAPPING[job["language"]]
+    batch_key = paraphrase_batch_key(f"<2{lang_tag}>", job["profile"])
+    paraphrased_sentences = await asyncio.gather(*[
+        paraphrase_one(span.text, lang_tag, batch_key) for span in sentence_spans(chunk["text"])
+    ])
+    return {"paraphrased": " ".join(paraphrased_sentences)}
+
+async def finalize_job(job: dict, chunks: List[dict]) -> dict:
+    """Combine chunk results, then record history and usage once per job"""
+    uid = job["uid"]
+    text = job["text"]
+
+    if job["type"] == "grammar":
+        grammar_checker = await grammar_model.wait()
+        errors = grammar_checker.merge_errors([
+            GrammarError(**e) for chunk in chunks for e in chunk["result"]["errors"]
+        ])
+        stats = grammar_checker.calculate_stats(text, errors)
+        error_dicts = [e.dict() for e in errors]
+
+        await record_grammar_check(uid, text, error_dicts, job["language"])
+
+        return {
+            "errors": error_dicts,
+            "stats": stats,
+            "corrected": " ".join(chunk["result"]["corrected"] for chunk in chunks),
+            "profile": job["profile"]
+        }
+
+    paraphrased = " ".join(chunk["result"]["paraphrased"] for chunk in chunks)
+
+    await record_paraphrase(uid, text, paraphrased, job["language"])
+
+    return {
+        "original": text,
+        "paraphrased": paraphrased,
+        "language": job["language"],
+        "profile": job["profile"]
+    }
+
+job_manager = JobManager(
+    JobStore(JOBS_DB_PATH),
+    process_job_chunk,
+    finalize_job,
+    max_concurrent_jobs=JOB_CONCURRENCY,
+    chunk_chars=JOB_CHUNK_CHARS
+)
+
+@app.on_event("startup")
+async def resume_jobs():
+    job_manager.resume()
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    await job_manager.shutdown()
+
+def get_owned_job(job_id: str, uid: str) -> dict:
+    job = job_manager.store.get(job_id)
+    if job is None or job["uid"] != uid:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def job_status(job: dict) -> JobStatus:
+    return JobStatus(
+        job_id=job["id"],
+        type=job["type"],
+        status=job["status"],
+        total_chunks=job["total_chunks"],
+        completed_chunks=job["completed_chunks"],
+        error=job["error"]
+    )
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(
+    request: JobRequest,
+    payload: dict = Depends(verify_access_token)
+):
+    """Submit a document for background grammar checking or paraphrasing"""
+    uid = payload['sub']
+    message = request.message.strip()
+    
+    if request.type not in JOB_TYPES:
+        raise HTTPException(status_code=400, detail=f"Job type must be one of: {', '.join(JOB_TYPES)}")
+    if not message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty.")
+    if request.type == "paraphrase" and request.language not in LANG_MAPPING:
+        raise HTTPException(status_code=400, detail=f"Unsupported language '{request.language}'")
+    
+    can_use, remaining, plan = await check_usage_limit(uid, request.type)
+    if not can_use:
+        raise HTTPException(
+            status_code=403,
+            detail="Monthly limit reached. Upgrade to premium for unlimited access."
+        )
+    profile = resolve_decoding_profile(plan, request.profile)
+    
+    job_id = job_manager.submit(uid, request.type, message, request.language, profile)
+    return job_status(job_manager.store.get(job_id))
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, payload: dict = Depends(verify_access_token)):
+    """Get job status and progress"""
+    return job_status(get_owned_job(job_id, payload['sub']))
+
+@app.get("/jobs/{job_id}/chunks")
+async def get_job_chunks(job_id: str, after: int = -1, payload: dict = Depends(verify_access_token)):
+    """Get partial results: completed chunks with index greater than ``after``"""
+    job = get_owned_job(job_id, payload['sub'])
+    return {
+        **job_status(job).dict(),
+        "chunks": [
+            {k: chunk[k] for k in ("index", "start", "end", "result")}
+            for chunk in job_manager.store.chunks(job_id, completed_only=True, after=after)
+        ]
+    }
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, payload: dict = Depends(verify_access_token)):
+    """Get the final result of a completed job"""
+    job = get_owned_job(job_id, payload['sub'])
+    if job["status"] != STATUS_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
+
+# Registered after every other shutdown hook so writes made while the
+# workers and jobs stop are still drained
+@app.on_event("shutdown")
+async def drain_history_writer():
+    await quota_manager.stop()
+    await history_writer.stop()
+
+
+# ============================
+# Metrics
+# ============================
+# Stage latencies, batch sizes and Firestore helper timings are recorded where
+# they happen (see utils.metrics); the gauges and counters below are read from
+# the components when /metrics is scraped
+
+def cache_counts(field: str) -> dict:
+    counts = {
+        ("correction",): getattr(correction_cache, field),
+        ("profile",): getattr(profile_cache, field),
+    }
+    # Spelling lookups are memoized per process; this covers in-process inference
+    if grammar_model.ready:
+        speller = grammar_model.get().speller
+        counts[("spelling",)] = getattr(speller.spell.cache_info(), field) + getattr(speller.suggest.cache_info(), field)
+    return counts
+
+metrics_registry.collect(
+    "vakhya_cache_hits_total", "Cache lookups answered from the cache", lambda: cache_counts("hits"),
+    kind="counter", labelnames=("cache",)
+)
+metrics_registry.collect(
+    "vakhya_cache_misses_total", "Cache lookups that missed", lambda: cache_counts("misses"),
+    kind="counter", labelnames=("cache",)
+)
+metrics_registry.collect(
+    "vakhya_queue_depth", "Work items waiting in each executor queue",
+    lambda: {
+        ("grammar-worker",): grammar_worker.depth(),
+        ("paraphrase-batcher",): paraphrase_batcher.pending(),
+        ("history-writer",): history_writer.metrics()["queue_depth"],
+    },
+    labelnames=("queue",)
+)
+metrics_registry.collect(
+    "vakhya_grammar_in_flight", "Grammar calls currently running", grammar_worker.in_flight
+)
+metrics_registry.collect(
+    "vakhya_model_load_seconds", "Time taken to load each model",
+    lambda: {(slot.name,): slot.load_seconds for slot in (grammar_model, paraphrase_model)},
+    labelnames=("model",)
+)
+metrics_registry.collect(
+    "vakhya_model_ready", "1 once the model has loaded",
+    lambda: {(slot.name,): int(slot.ready) for slot in (grammar_model, paraphrase_model)},
+    labelnames=("model",)
+)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text-format metrics for this process"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/health/live")
+async def liveness_check():
+    """The process is up and serving requests (models may still be loading)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """200 once every model is loaded, 503 while any is loading or failed"""
+    models = {slot.name: slot.status() for slot in (grammar_model, paraphrase_model)}
+    ready = all(slot.ready for slot in (grammar_model, paraphrase_model))
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "models": models}
+    )
+
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
-        "hunspell_loaded": grammar_checker is not None,
-        "model_loaded": grammar_checker is not None,
-        "device": grammar_checker.device if grammar_checker else "N/A"
+        "hunspell_loaded": grammar_model.ready,
+        "model_loaded": grammar_model.ready,
+        "models": {slot.name: slot.status() for slot in (grammar_model, paraphrase_model)},
+        "device": grammar_model.get().device if grammar_model.ready else "N/A",
+        "inference_backend": INFERENCE_BACKEND,
+        "grammar_queue_depth": grammar_worker.depth(),
+        "grammar_in_flight": grammar_worker.in_flight(),
+        "cache": correction_cache.stats(),
+        "history_writer": history_writer.metrics(),
+        "quota": quota_manager.metrics(),
+        "inference_pool": inference_pool.stats() if inference_pool is not None else None,
+        "profile_cache": profile_cache.stats(),
+        "incremental": document_checks.stats()
     }
 
 if __name__ == "__main__":
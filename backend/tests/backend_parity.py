@@ -0,0 +1,57 @@
+"""Compare a candidate inference backend against eager PyTorch on fixed sentences.
+
+Usage (from backend/):  python -m tests.backend_parity quantized
+"""
+import sys
+from transformers import AlbertTokenizer, AutoTokenizer
+from utils.inference_backend import load_seq2seq_model, parity_report
+
+GRAMMAR_MODEL = "sarthak2314/indicbart-hindi-gec-v1"
+PARAPHRASE_MODEL = "ai4bharat/MultiIndicParaphraseGeneration"
+
+sentences = [
+    "लड़का स्कूल गई।",
+    "मैं घर जा है।",
+    "टेबल पर किताब हैं।",
+    "मुजे आप का किताब चाहिए",
+    "राम और सीता बाजार गया।",
+    "वे सब्जी खरीदा और घर आये।",
+    "बच्चे खेल रहा है।",
+    "मै आप से मिलना चाहता हु।",
+    "शाम को हम सब घर आ गया।",
+    "प्रधानमंत्री ने देश को संबोधित किया।",
+]
+
+backend = sys.argv[1] if len(sys.argv) > 1 else "quantized"
+
+# Grammar model: "sentence </s> <2hi>" with default special tokens
+tokenizer = AlbertTokenizer.from_pretrained(GRAMMAR_MODEL, do_lower_case=False, use_fast=False, keep_accents=True)
+report = parity_report(
+    tokenizer,
+    load_seq2seq_model(GRAMMAR_MODEL, "eager"),
+    load_seq2seq_model(GRAMMAR_MODEL, backend),
+    [f"{s} </s> <2hi>" for s in sentences],
+    max_length=128, num_beams=5, early_stopping=True
+)
+print(f"\n{'='*50}")
+print(f"Grammar ({backend}): {report['matches']}/{report['total']} identical to eager")
+for m in report['mismatches']:
+    print(f"  • {m['input']}\n    eager: {m['reference']}\n    {backend}: {m['candidate']}")
+
+# Paraphrase model: "sentence </s> <2hi>" without special tokens, decoder starts at <2hi>
+tokenizer = AutoTokenizer.from_pretrained(PARAPHRASE_MODEL, do_lower_case=False, use_fast=False, keep_accents=True)
+ids = {t: tokenizer._convert_token_to_id_with_added_voc(t) for t in ["<s>", "</s>", "<pad>", "<2hi>"]}
+report = parity_report(
+    tokenizer,
+    load_seq2seq_model(PARAPHRASE_MODEL, "eager"),
+    load_seq2seq_model(PARAPHRASE_MODEL, backend),
+    [f"{s} </s> <2hi>" for s in sentences],
+    add_special_tokens=False,
+    num_beams=4, max_length=256, no_repeat_ngram_size=3, encoder_no_repeat_ngram_size=3,
+    early_stopping=True, pad_token_id=ids["<pad>"], bos_token_id=ids["<s>"],
+    eos_token_id=ids["</s>"], decoder_start_token_id=ids["<2hi>"]
+)
+print(f"\n{'='*50}")
+print(f"Paraphrase ({backend}): {report['matches']}/{report['total']} identical to eager")
+for m in report['mismatches']:
+    print(f"  • {m['input']}\n    eager: {m['reference']}\n    {backend}: {m['candidate']}")
@@ -0,0 +1,54 @@
+"""Check that incremental re-checks bill usage and write history once per document.
+
+Replays the endpoint's flow (split, check, store, claim_billing) with a
+stand-in checker and counts what would be recorded, so it runs anywhere.
+
+Usage (from backend/):  python -m tests.incremental_billing
+"""
+from utils.incremental import DocumentCheckStore
+from utils.segmenter import sentence_spans
+
+usage = 0
+history = []
+
+
+def check(name: str, ok: bool):
+    print(f"{'✓' if ok else '✗'} {name}")
+    if not ok:
+        raise SystemExit(1)
+
+
+def incremental_call(store: DocumentCheckStore, uid: str, document_id: str, text: str) -> int:
+    """One /grammar_check/incremental call; returns the number of rechecked sentences"""
+    global usage
+    spans = sentence_spans(text)
+    results, changed = store.split(uid, document_id, "standard", spans)
+    results.update({span.index: (span.text, []) for span in changed})
+    store.store(uid, document_id, "standard", spans, [results[span.index] for span in spans])
+    if changed and store.claim_billing(uid, document_id):
+        usage += 1
+        history.append(text)
+    return len(changed)
+
+
+store = DocumentCheckStore()
+edits = [
+    "पहला वाक्य। दूसरा वाक्य।",
+    "पहला वाक्य। दूसरा वाक्य बदला।",
+    "पहला वाक्य। दूसरा वाक्य बदला। तीसरा वाक्य।",
+    "पहला वाक्य। दूसरा वाक्य बदला। तीसरा वाक्य।",
+    "नया पहला वाक्य। दूसरा वाक्य बदला। तीसरा वाक्य।",
+]
+rechecked = [incremental_call(store, "user-1", "doc-1", text) for text in edits]
+check("edits re-run the model on changed sentences", rechecked == [2, 1, 1, 0, 1])
+check("usage increases once for five calls", usage == 1)
+check("history gets one entry for five calls", history == edits[:1])
+
+incremental_call(store, "user-1", "doc-2", "अलग दस्तावेज़।")
+incremental_call(store, "user-2", "doc-1", "दूसरे उपयोगकर्ता का वाक्य।")
+check("other documents and users are billed separately", usage == 3 and len(history) == 3)
+
+store.forget("user-1", "doc-1")
+incremental_call(store, "user-1", "doc-1", edits[-1])
+incremental_call(store, "user-1", "doc-1", edits[-1] + " एक और।")
+check("a forgotten document starts a new billed session", usage == 4 and len(history) == 4)
@@ -0,0 +1,43 @@
+"""Start two model slots at once and check both finish loading.
+
+Uses the tiny random model from the benchmarks, so it runs anywhere.
+Without the lock in load_seq2seq_model, concurrent loads left models with
+meta tensors ("Cannot copy out of meta tensor").
+
+Usage (from backend/):  python -m tests.model_slots_concurrent
+"""
+import asyncio
+
+from benchmarks.tiny_model import DEFAULT_TINY_DIR, ensure_tiny_model
+from utils.inference_backend import load_seq2seq_model
+from utils.model_loader import MODEL_READY, ModelNotReadyError, ModelSlot
+
+ROUNDS = 5
+
+model_path = ensure_tiny_model(DEFAULT_TINY_DIR)
+
+
+async def start_both() -> list:
+    slots = [
+        ModelSlot("grammar", lambda: load_seq2seq_model(model_path, "eager")),
+        ModelSlot("paraphrase", lambda: load_seq2seq_model(model_path, "eager")),
+    ]
+    for slot in slots:
+        slot.start()
+    for slot in slots:
+        try:
+            await slot.wait()
+        except ModelNotReadyError:
+            pass
+    return [slot.state for slot in slots]
+
+
+failures = 0
+for round_number in range(1, ROUNDS + 1):
+    states = asyncio.run(start_both())
+    ok = all(state == MODEL_READY for state in states)
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} round {round_number}: {states}")
+
+if failures:
+    raise SystemExit(f"{failures}/{ROUNDS} rounds left a model not ready")
@@ -0,0 +1,96 @@
+"""Smoke test for the inference process pool: dispatch, errors and crash restarts.
+
+Uses a small torch module instead of the real models, so it runs anywhere.
+
+Usage (from backend/):  python -m tests.process_pool_smoke
+"""
+import os
+import signal
+import threading
+import time
+
+import torch
+
+from utils.process_pool import InferenceProcessPool, WorkerCrashedError
+
+
+class Model:
+    def __init__(self):
+        torch.manual_seed(0)
+        self.model = torch.nn.Linear(64, 64)
+
+    def forward(self, scale: float) -> tuple:
+        with torch.no_grad():
+            return float(self.model(torch.full((64,), scale)).sum()), os.getpid()
+
+    def count(self, n: int):
+        for i in range(n):
+            yield i
+
+    def fail(self):
+        raise ValueError("bad input")
+
+    def crash(self):
+        os._exit(3)
+
+
+def check(name: str, ok: bool):
+    print(f"{'✓' if ok else '✗'} {name}")
+    if not ok:
+        raise SystemExit(1)
+
+
+model = Model()
+expected = model.forward(2.0)[0]
+
+pool = InferenceProcessPool({"model": model}, num_processes=2, threads_per_process=1)
+pool.start()
+try:
+    # Dispatch: concurrent calls from several threads, each answered by a worker
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.call("model", "forward", 2.0))) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check("16 concurrent calls return the parent's result", len(results) == 16 and all(abs(r[0] - expected) < 1e-4 for r in results))
+    check("calls run outside this process", all(pid != os.getpid() for _, pid in results))
+    check("generator methods stream their items", list(pool.iter_call("model", "count", 5)) == [0, 1, 2, 3, 4])
+
+    # Errors raised by the model reach the caller with their type
+    try:
+        pool.call("model", "fail")
+        check("model errors propagate", False)
+    except ValueError as e:
+        check("model errors propagate", str(e) == "bad input")
+
+    # A worker that dies fails its call and is replaced
+    try:
+        pool.call("model", "crash")
+        check("a crashed worker fails its call", False)
+    except WorkerCrashedError:
+        check("a crashed worker fails its call", True)
+    deadline = time.monotonic() + 10
+    while pool.stats()["alive"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    stats = pool.stats()
+    check("the crashed worker is restarted", stats["restarts"] == 1 and stats["alive"] == 2)
+    check("calls work after the restart", abs(pool.call("model", "forward", 2.0)[0] - expected) < 1e-4)
+finally:
+    pool.close()
+check("close stops every worker", pool.stats()["alive"] == 0)
+
+# Without its supervisor the pool stops and fails pending calls instead of hanging
+pool = InferenceProcessPool({"model": model}, num_processes=1)
+pool.start()
+os.kill(pool._supervisor.pid, signal.SIGKILL)
+try:
+    pool.call("model", "forward", 1.0)
+    stopped = not pool.running
+except (WorkerCrashedError, RuntimeError):
+    stopped = True
+deadline = time.monotonic() + 5
+while pool.running and time.monotonic() < deadline:
+    time.sleep(0.1)
+check("a dead supervisor stops the pool", stopped and not pool.running)
+pool.close()
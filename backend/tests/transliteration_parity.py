@@ -0,0 +1,36 @@
+"""Compare the table-driven transliteration against indic-nlp and time both.
+
+Usage (from backend/):  python -m tests.transliteration_parity
+"""
+import time
+from indicnlp.transliterate.unicode_transliterate import UnicodeIndicTransliterator
+from benchmarks.corpus import build_corpus
+from utils.paraphraser import LANG_MAPPING
+from utils.transliteration import Transliterator
+
+# The benchmark corpus plus every character of the Devanagari block
+sentences = build_corpus(2000) + ["".join(chr(c) for c in range(0x0900, 0x0980))]
+
+transliterator = Transliterator(LANG_MAPPING.values(), source="hi")
+
+for language, tag in LANG_MAPPING.items():
+    mismatches = 0
+    table_seconds = reference_seconds = 0.0
+    for sentence in sentences:
+        started = time.perf_counter()
+        reference = UnicodeIndicTransliterator.transliterate(sentence, "hi", tag)
+        reference_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        candidate = transliterator.transliterate(sentence, tag)
+        table_seconds += time.perf_counter() - started
+
+        if candidate != reference:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"  • {tag}: {sentence!r}\n    indic-nlp: {reference!r}\n    table:     {candidate!r}")
+
+    print(
+        f"{language:<10} {len(sentences) - mismatches}/{len(sentences)} identical   "
+        f"indic-nlp {reference_seconds * 1000:8.1f} ms   table {table_seconds * 1000:6.1f} ms"
+    )
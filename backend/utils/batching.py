@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, List, Tuple
+
+from utils.metrics import BATCHER_BATCH_SIZE
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Collects items submitted by concurrent requests into batched model calls.
+
+    A worker thread waits for the first pending item, keeps collecting
+    for up to ``max_wait_ms`` (or until ``max_batch_size`` items are pending),
+    groups the items by their key and calls ``batch_fn(items, **dict(key))``
+    once per group. Each caller gets a ``concurrent.futures.Future`` that
+    resolves to its own entry of the returned list; an entry that is an
+    exception instance is raised to that caller alone. With ``num_workers`` > 1
+    several batches can run at once (e.g. on separate inference processes).
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[..., List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+        num_workers: int = 1,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, num_workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, item: Any, key: Tuple[Tuple[str, Hashable], ...] = ()) -> Future:
+        """Queue one item; items only share a batch when their keys are equal"""
+        future: Future = Future()
+        self._queue.put((key, item, future))
+        return future
+
+    def pending(self) -> int:
+        """Number of items waiting for the next batch"""
+        return self._queue.qsize()
+
+    def close(self, timeout: float = 5.0):
+        """Stop the workers once the items already queued are processed"""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _collect(self) -> Tuple[list, bool]:
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        pending = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return pending, True
+            pending.append(entry)
+        return pending, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            pending, stopping = self._collect()
+
+            groups = {}
+            for key, item, future in pending:
+                # Callers that gave up (e.g. client disconnected) are dropped here
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(key, []).append((item, future))
+
+            for key, entries in groups.items():
+                self._run_batch(key, entries)
+
+    def _run_batch(self, key, entries):
+        items = [item for item, _ in entries]
+        BATCHER_BATCH_SIZE.observe(len(items), batcher=self.name)
+        try:
+            results = self.batch_fn(items, **dict(key))
+        except Exception as e:
+            logger.error(f"{self.name}: batch of {len(items)} failed: {e}", exc_info=True)
+            for _, future in entries:
+                future.set_exception(e)
+            return
+
+        if len(results) != len(entries):
+            # Results can't be matched to callers, so none of them is resolved with one
+            error = RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(entries)} items")
+            logger.error(str(error))
+            for _, future in entries:
+                future.set_exception(error)
+            return
+
+        for (_, future), result in zip(entries, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
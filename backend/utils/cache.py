@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC with collapsed whitespace"""
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+def make_cache_key(text: str, model_id: str, language: str, **decoding_params) -> str:
+    """Build a cache key from the normalized sentence, model, language and decoding settings"""
+    payload = json.dumps(
+        [normalize_text(text), model_id, language, sorted(decoding_params.items())],
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CorrectionCache:
+    """Model output cache with an in-process LRU tier and an optional SQLite tier.
+
+    The memory tier holds at most ``max_entries`` values. When ``db_path`` is
+    set, values are also written to a SQLite file (WAL mode) that several
+    uvicorn workers can share and that survives restarts; it is pruned to
+    ``max_disk_entries`` rows. Entries older than ``ttl_seconds`` are ignored
+    and eventually removed from both tiers.
+    """
+
+    PRUNE_EVERY = 500
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 500000,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_prune = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            logger.info(f"✓ Correction cache disk tier at {db_path}")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        if self.db_path:
+            row = self._disk_get(key)
+            if row is not None and not self._expired(row[1], now):
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                return row[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+
+        if self.db_path:
+            self._disk_set(key, value, now)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, value: str, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # ----------------------------
+    # SQLite tier
+    # ----------------------------
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process, opened on first use. A forked
+        # child (e.g. an inference pool worker) opens its own and leaves the
+        # inherited one alone: closing it there could checkpoint or remove the
+        # WAL the parent is still using
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(os.getpid())
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)")
+            conn.commit()
+            connections[os.getpid()] = conn
+        return conn
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        try:
+            return self._connection().execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Correction cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, value: str, created_at: float):
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Correction cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune < self.PRUNE_EVERY:
+                return
+            self._writes_since_prune = 0
+        self._prune()
+
+    def _prune(self):
+        """Drop expired rows and the oldest rows beyond max_disk_entries"""
+        try:
+            conn = self._connection()
+            if self.ttl_seconds is not None:
+                conn.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Correction cache prune failed: {e}")
@@ -0,0 +1,24 @@
+# ============================
+# Decoding profiles
+# ============================
+# Named generate() settings per task. "quality" matches the settings the
+# endpoints used before profiles existed.
+DECODING_PROFILES = {
+    "fast": {
+        "grammar": {"num_beams": 1, "max_length": 128, "early_stopping": False},
+        "paraphrase": {"num_beams": 1, "max_length": 256, "early_stopping": False},
+    },
+    "balanced": {
+        "grammar": {"num_beams": 2, "max_length": 128, "early_stopping": True},
+        "paraphrase": {"num_beams": 2, "max_length": 256, "early_stopping": True},
+    },
+    "quality": {
+        "grammar": {"num_beams": 5, "max_length": 128, "early_stopping": True},
+        "paraphrase": {"num_beams": 4, "max_length": 256, "early_stopping": True},
+    },
+}
+
+
+def get_decoding_params(profile: str, task: str) -> dict:
+    """generate() keyword arguments for a profile and task ('grammar' or 'paraphrase')"""
+    return dict(DECODING_PROFILES[profile][task])
@@ -0,0 +1,75 @@
+import time
+from typing import Callable, List, Optional
+
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList
+
+# Output budget: corrections and paraphrases are about as long as their input,
+# so generate() gets ratio x input tokens plus some slack, capped by the
+# profile's max_length
+OUTPUT_LENGTH_RATIO = 1.5
+OUTPUT_LENGTH_SLACK = 10
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before its generate call could start"""
+
+
+def adaptive_max_length(input_length: int, max_length: int) -> int:
+    """generate() max_length for inputs of ``input_length`` tokens, never above ``max_length``"""
+    return max(1, min(max_length, int(input_length * OUTPUT_LENGTH_RATIO) + OUTPUT_LENGTH_SLACK))
+
+
+class DeadlineStoppingCriteria(StoppingCriteria):
+    """Stops generation once ``time.monotonic()`` reaches ``deadline``.
+
+    Beam search then returns its best hypotheses so far. ``expired`` records
+    whether the deadline cut the call short, so callers can avoid caching the
+    truncated output.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.expired = False
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        if time.monotonic() >= self.deadline:
+            self.expired = True
+        return torch.full((input_ids.shape[0],), self.expired, dtype=torch.bool, device=input_ids.device)
+
+
+def deadline_criteria(deadline: Optional[float]) -> Optional[DeadlineStoppingCriteria]:
+    """Criteria for a generate call, or None without a deadline.
+
+    Raises ``DeadlineExceededError`` if the deadline has already passed.
+    """
+    if deadline is None:
+        return None
+    if time.monotonic() >= deadline:
+        raise DeadlineExceededError("Request deadline passed before generation started")
+    return DeadlineStoppingCriteria(deadline)
+
+
+def stopping_kwargs(criteria: Optional[DeadlineStoppingCriteria]) -> dict:
+    """generate() keyword arguments for optional deadline criteria"""
+    return {"stopping_criteria": StoppingCriteriaList([criteria])} if criteria is not None else {}
+
+
+def split_windows(text: str, count_tokens: Callable[[str], int], max_tokens: int) -> List[str]:
+    """Split ``text`` at word boundaries into pieces of at most ``max_tokens`` tokens.
+
+    A single word longer than ``max_tokens`` becomes a piece of its own.
+    """
+    windows = []
+    words: List[str] = []
+    used = 0
+    for word in text.split():
+        tokens = count_tokens(word)
+        if words and used + tokens > max_tokens:
+            windows.append(" ".join(words))
+            words, used = [], 0
+        words.append(word)
+        used += tokens
+    if words:
+        windows.append(" ".join(words))
+    return windows
@@ -1,19 +1,30 @@
 import torch
-from transformers import AlbertTokenizer, AutoModelForSeq2SeqLM
+from transformers import AlbertTokenizer
 import difflib
 import string
-from typing import List, Optional
+from typing import Iterator, List, Optional, Set, Tuple
 from models.models import (
     GrammarRequest,
     GrammarError,
     GrammarResponse,
 )
+from utils.cache import CorrectionCache, make_cache_key
+from utils.spelling import SpellingSuggester
+from utils.segmenter import SentenceSpan, find_span, sentence_spans
+from utils.inference_backend import load_seq2seq_model
+from utils.metrics import GENERATE_BATCH_SIZE, stage_timer
+from utils.decoding_budget import adaptive_max_length, deadline_criteria, split_windows, stopping_kwargs
 import re
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("HindiGrammarChecker")
 
+DEVANAGARI_WORD = re.compile(r'[\u0900-\u097F]+')
+
+# Input window of the grammar model, in tokens
+MAX_INPUT_TOKENS = 128
+
 # राम और सीता बाजार गया। वे सब्जी खरीदा और घर आये। बच्चे खेल रहा है। मुजे उनका किताब चाहिए था।
 # लड़की स्कूल गया। उसने अपना काम किया। टीचर बहुत खुश था। सब बच्चा अच्छा है।
 # मैं कल दिल्ली जा। वह खाना खा। हम फिल्म देख। तुम कहा रहते?
@@ -25,15 +36,32 @@ logger = logging.getLogger("HindiGrammarChecker")
 class HindiGrammarChecker:
     """Grammar checker using fine-tuned IndicBART + Hunspell"""
     
-    def __init__(self, model_path: str, hunspell_dic: str, hunspell_aff: str):
+    def __init__(
+        self,
+        model_path: str,
+        hunspell_dic: str,
+        hunspell_aff: str,
+        batch_size: int = 8,
+        cache: Optional[CorrectionCache] = None,
+        spelling_backend: str = "symspell",
+        inference_backend: str = "eager",
+        onnx_dir: Optional[str] = None
+    ):
         import hunspell
         
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model_path = model_path
+        self.model_id = f"{model_path}:{inference_backend}"
+        self.batch_size = max(1, batch_size)
+        
+        # Dynamic int8 quantization only runs on CPU
+        self.device = "cuda" if torch.cuda.is_available() and inference_backend != "quantized" else "cpu"
         logger.info(f"Grammar checker using device: {self.device}")
         
         # Load Hunspell
         self.hobj = hunspell.HunSpell(hunspell_dic, hunspell_aff)
         logger.info("Hunspell loaded")
+        self.speller = SpellingSuggester(self.hobj, hunspell_dic, backend=spelling_backend)
+        logger.info(f"Spelling suggestions via {self.speller.backend}")
         
         # Load fine-tuned model
         self.tokenizer = AlbertTokenizer.from_pretrained(
@@ -42,68 +70,146 @@ class HindiGrammarChecker:
             use_fast=False,
             keep_accents=True
         )
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_path).to(self.device)
-        self.model.eval()
+        self.model = load_seq2seq_model(model_path, inference_backend, self.device, onnx_dir)
         logger.info("Fine-tuned model loaded")
         
-        self.correction_cache = {}
+        self.correction_cache = cache if cache is not None else CorrectionCache()
+        self.decoding_params = {"max_length": 128, "num_beams": 5, "early_stopping": True}
     
-    def get_corrected_text(self, text: str) -> str:
+    def get_corrected_text(self, text: str, decoding_params: Optional[dict] = None, deadline: Optional[float] = None) -> str:
         """Get grammar-corrected text from model"""
-        if text in self.correction_cache:
-            return self.correction_cache[text]
+        return self.get_corrected_batch([text], decoding_params, deadline)[0]
+    
+    def get_corrected_batch(
+        self, texts: List[str], decoding_params: Optional[dict] = None, deadline: Optional[float] = None
+    ) -> List[str]:
+        """Get grammar-corrected text for several sentences (see ``correct_batch``)"""
+        return self.correct_batch(texts, decoding_params, deadline)[0]
+    
+    def correct_batch(
+        self, texts: List[str], decoding_params: Optional[dict] = None, deadline: Optional[float] = None
+    ) -> Tuple[List[str], List[bool]]:
+        """Grammar-corrected text for several sentences, and whether each was cut short.
         
-        inference_text = f"{text} </s> <2hi>"
-        inputs = self.tokenizer(
-            inference_text,
-            return_tensors="pt",
-            padding=True,
-            max_length=128,
-            truncation=True
-        ).to(self.device)
+        Cache misses are tokenized once, sorted by token length and split into
+        buckets of at most ``batch_size`` so each generate call pads little.
+        Sentences longer than the model's input window are corrected in
+        word-aligned windows that are joined back afterwards. Each bucket's
+        max_length follows its input length (capped by the profile's), and a
+        ``deadline`` (``time.monotonic()`` seconds) stops generation early with
+        the best hypotheses so far; such results are flagged as truncated and
+        not cached. ``decoding_params`` defaults to ``self.decoding_params``.
+        """
+        decoding_params = decoding_params if decoding_params is not None else self.decoding_params
+        keys = [
+            make_cache_key(text, self.model_id, "hi", **decoding_params)
+            for text in texts
+        ]
+        results = {}
+        misses = {}
+        truncated_keys = set()
+        for key, text in zip(keys, texts):
+            if key in results or key in misses:
+                continue
+            cached = self.correction_cache.get(key)
+            if cached is None:
+                misses[key] = text
+            else:
+                results[key] = cached
         
-        with torch.no_grad():
-            output_ids = self.model.generate(
-                inputs["input_ids"],
-                max_length=128,
-                num_beams=5,
-                early_stopping=True
-            )
+        if misses:
+            miss_keys = list(misses)
+            with stage_timer("grammar", "tokenize"):
+                pieces = self.encode_windows([misses[key] for key in miss_keys])
+            order = sorted(range(len(pieces)), key=lambda p: len(pieces[p][1]))
+            outputs = [""] * len(pieces)
+            truncated = set()
+            max_length = decoding_params.get("max_length", MAX_INPUT_TOKENS)
+            
+            for start in range(0, len(order), self.batch_size):
+                bucket = order[start:start + self.batch_size]
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [pieces[p][1] for p in bucket]},
+                    return_tensors="pt"
+                ).to(self.device)
+                params = dict(decoding_params, max_length=adaptive_max_length(inputs["input_ids"].shape[1], max_length))
+                criteria = deadline_criteria(deadline)
+                
+                GENERATE_BATCH_SIZE.observe(len(bucket), pipeline="grammar")
+                with torch.no_grad(), stage_timer("grammar", "generate"):
+                    output_ids = self.model.generate(
+                        inputs["input_ids"],
+                        attention_mask=inputs["attention_mask"],
+                        **params,
+                        **stopping_kwargs(criteria)
+                    )
+                
+                with stage_timer("grammar", "decode"):
+                    corrected = self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+                for p, text in zip(bucket, corrected):
+                    outputs[p] = text
+                if criteria is not None and criteria.expired:
+                    logger.warning(f"Deadline reached during generate; returning partial corrections for {len(bucket)} inputs")
+                    truncated.update(pieces[p][0] for p in bucket)
+            
+            corrected_pieces = [[] for _ in miss_keys]
+            for (i, _), text in zip(pieces, outputs):
+                corrected_pieces[i].append(text)
+            for i, key in enumerate(miss_keys):
+                results[key] = " ".join(corrected_pieces[i])
+                if i in truncated:
+                    truncated_keys.add(key)
+                else:
+                    self.correction_cache.set(key, results[key])
         
-        corrected = self.tokenizer.decode(output_ids[0], skip_special_tokens=True)
-        self.correction_cache[text] = corrected
-        return corrected
+        return [results[key] for key in keys], [key in truncated_keys for key in keys]
     
-    def get_sentence_context(self, text: str, start_pos: int) -> Optional[str]:
+    def encode_windows(self, texts: List[str]) -> List[Tuple[int, List[int]]]:
+        """(text index, input ids) pairs; texts beyond MAX_INPUT_TOKENS become several windows"""
+        encoded = self.tokenizer([f"{text} </s> <2hi>" for text in texts])["input_ids"]
+        pieces = []
+        for i, ids in enumerate(encoded):
+            if len(ids) <= MAX_INPUT_TOKENS:
+                pieces.append((i, ids))
+                continue
+            # Room left in the window after the "</s> <2hi>" suffix and special tokens
+            budget = MAX_INPUT_TOKENS - len(self.tokenizer("</s> <2hi>")["input_ids"])
+            windows = split_windows(texts[i], lambda word: len(self.tokenizer.tokenize(word)), budget)
+            for window_ids in self.tokenizer(
+                [f"{window} </s> <2hi>" for window in windows],
+                max_length=MAX_INPUT_TOKENS,
+                truncation=True
+            )["input_ids"]:
+                pieces.append((i, window_ids))
+        return pieces
+    
+    def get_sentence_context(self, text: str, start_pos: int, spans: Optional[List[SentenceSpan]] = None) -> Optional[str]:
         """Extract sentence context"""
-        sentence_pattern = r'[^।.!?]*[।.!?]\s*|$'
-        matches = list(re.finditer(sentence_pattern, text))
-        
-        for match in matches:
-            if match.start() <= start_pos < match.end():
-                return match.group(0).strip()
-        return text
+        span = find_span(spans if spans is not None else sentence_spans(text), start_pos)
+        return span.text if span else text
     
-    def check_spelling(self, text: str) -> List[GrammarError]:
+    def check_spelling(self, text: str, spans: Optional[List[SentenceSpan]] = None) -> List[GrammarError]:
         """Hunspell spelling check"""
         errors = []
         error_id = 1
-        matches = re.finditer(r'[\u0900-\u097F]+', text)
         
-        for match in matches:
-            word = match.group(0)
-            if not self.hobj.spell(word):
-                suggestions = self.hobj.suggest(word)
-                if suggestions:
-                    errors.append(GrammarError(
-                        id=error_id,
-                        type="Spelling",
-                        message="Possible spelling mistake",
-                        original=word,
-                        suggestion=suggestions[0],
-                        context=self.get_sentence_context(text, match.start())
-                    ))
-                    error_id += 1
+        # Words are scanned sentence by sentence so each one's context is
+        # the span it was found in, with no per-word lookup
+        for span in (spans if spans is not None else sentence_spans(text)):
+            for match in DEVANAGARI_WORD.finditer(span.text):
+                word = match.group(0)
+                if not self.speller.spell(word):
+                    suggestions = self.speller.suggest(word)
+                    if suggestions:
+                        errors.append(GrammarError(
+                            id=error_id,
+                            type="Spelling",
+                            message="Possible spelling mistake",
+                            original=word,
+                            suggestion=suggestions[0],
+                            context=span.text
+                        ))
+                        error_id += 1
         return errors
     
     def is_common_spelling_error(self, orig: str, corr: str) -> bool:
@@ -253,32 +359,20 @@ class HindiGrammarChecker:
 
         return errors
     
-    def check_text(self, text: str) -> tuple[List[GrammarError], str]:
-        """Main check method"""
-        all_errors = []
-        sentences = re.findall(r'[^।.!?]+[।.!?]?', text)
-        corrected_sentences = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            
-            # 1. Check spelling with Hunspell
-            spelling_errors = self.check_spelling(sentence)
-            all_errors.extend(spelling_errors)
-            
-            # 2. Get grammar correction from model
-            corrected_sentence = self.get_corrected_text(sentence)
-            corrected_sentences.append(corrected_sentence)
-            
-            # 3. Find grammar errors by comparing original vs corrected
-            grammar_errors = self.find_grammar_errors(sentence, corrected_sentence)
-            all_errors.extend(grammar_errors)
-        
-        # Join corrected sentences
-        corrected_text = " ".join(corrected_sentences)
+    def check_sentence(self, text: str, span: SentenceSpan, corrected_sentence: Optional[str]) -> List[GrammarError]:
+        """Spelling and grammar errors for one sentence span of ``text``; no correction means spelling only"""
+        # 1. Check spelling with Hunspell
+        with stage_timer("grammar", "hunspell"):
+            errors = self.check_spelling(text, spans=[span])
         
+        # 2. Find grammar errors by comparing original vs corrected
+        if corrected_sentence is not None:
+            with stage_timer("grammar", "diff"):
+                errors.extend(self.find_grammar_errors(span.text, corrected_sentence))
+        return errors
+    
+    def merge_errors(self, all_errors: List[GrammarError]) -> List[GrammarError]:
+        """Drop spelling errors the model already corrected, deduplicate and renumber"""
         # 🔥 CRITICAL: Remove spelling errors for words AI already corrected
         grammar_words = {
             e.original.strip().rstrip('।.,!?') 
@@ -304,7 +398,57 @@ class HindiGrammarChecker:
         for idx, error in enumerate(unique_errors, 1):
             error.id = idx
         
-        return unique_errors, corrected_text
+        return unique_errors
+    
+    def check_text(
+        self, text: str, decoding_params: Optional[dict] = None, deadline: Optional[float] = None
+    ) -> tuple[List[GrammarError], str]:
+        """Main check method"""
+        results, _ = self.check_spans(text, sentence_spans(text), decoding_params, deadline)
+        all_errors = [error for _, errors in results for error in errors]
+        
+        # Join corrected sentences
+        corrected_text = " ".join(corrected for corrected, _ in results)
+        
+        return self.merge_errors(all_errors), corrected_text
+    
+    def check_spans(
+        self,
+        text: str,
+        spans: List[SentenceSpan],
+        decoding_params: Optional[dict] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[List[Tuple[str, List[GrammarError]]], Set[int]]:
+        """(corrected sentence, raw errors) for each of the given sentence spans of ``text``.
+        
+        Also returns the indices of the spans whose generation the deadline cut
+        short. A partial hypothesis would diff as deleted words, so those
+        sentences are returned as written, with spelling errors only.
+        """
+        # Grammar corrections for all sentences come from batched generate calls;
+        # spelling and diff stages then run over the batch results
+        corrected_sentences, cut_short = self.correct_batch([span.text for span in spans], decoding_params, deadline)
+        results = []
+        truncated = set()
+        for span, corrected_sentence, partial in zip(spans, corrected_sentences, cut_short):
+            if partial:
+                truncated.add(span.index)
+                results.append((span.text, self.check_sentence(text, span, None)))
+            else:
+                results.append((corrected_sentence, self.check_sentence(text, span, corrected_sentence)))
+        return results, truncated
+    
+    def iter_check_text(
+        self, text: str, decoding_params: Optional[dict] = None
+    ) -> Iterator[Tuple[SentenceSpan, List[GrammarError], str]]:
+        """Yield (span, errors, corrected_sentence) as soon as each sentence is checked.
+        
+        Errors are raw per-sentence results; pass the collected errors of all
+        sentences through ``merge_errors`` for the document-level list.
+        """
+        for span in sentence_spans(text):
+            corrected_sentence = self.get_corrected_text(span.text, decoding_params)
+            yield span, self.check_sentence(text, span, corrected_sentence), corrected_sentence
     
     def calculate_stats(self, text: str, errors: List[GrammarError]) -> dict:
         """Calculate quality stats"""
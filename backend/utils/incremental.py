@@ -0,0 +1,131 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Collection, Dict, List, Optional, Tuple
+
+from models.models import GrammarError
+from utils.segmenter import SentenceSpan
+
+# Per-sentence result: (corrected sentence, raw errors from check_sentence)
+SentenceCheck = Tuple[str, List[GrammarError]]
+
+
+def sentence_hash(sentence: str) -> bytes:
+    return hashlib.blake2b(sentence.encode("utf-8"), digest_size=16).digest()
+
+
+class _Document:
+    __slots__ = ("profile", "results", "touched_at", "billed")
+
+    def __init__(self, profile: str, results: Dict[bytes, SentenceCheck], touched_at: float, billed: bool = False):
+        self.profile = profile
+        self.results = results
+        self.touched_at = touched_at
+        self.billed = billed
+
+
+class DocumentCheckStore:
+    """Per-sentence grammar results of the last checked version of each document.
+
+    Documents are keyed by (uid, client document id). A re-check looks up
+    every sentence of the new version by content hash: unchanged sentences
+    reuse their stored result wherever they now sit, and only new or edited
+    ones need the model. After the check only the new version's sentences
+    are kept, so a document holds at most one result per current sentence.
+    Results are tied to the decoding profile they were made with. At most
+    ``max_documents`` documents are kept (least recently checked dropped
+    first), each for ``ttl_seconds`` after its last check.
+
+    A document's session lasts until it is forgotten, expires or is dropped;
+    ``claim_billing`` is true once per session, so an editor re-checking the
+    same document is billed and recorded in history only once.
+    """
+
+    def __init__(self, max_documents: int = 10000, ttl_seconds: float = 3600):
+        self.max_documents = max(1, max_documents)
+        self.ttl_seconds = ttl_seconds
+        self._documents: "OrderedDict[Tuple[str, str], _Document]" = OrderedDict()
+
+        self.rechecked = 0
+        self.reused = 0
+
+    def split(
+        self, uid: str, document_id: str, profile: str, spans: List[SentenceSpan]
+    ) -> Tuple[Dict[int, SentenceCheck], List[SentenceSpan]]:
+        """Stored results by span index, and the spans that still need checking"""
+        document = self._get(uid, document_id)
+        previous = document.results if document is not None and document.profile == profile else {}
+
+        reused = {}
+        changed = []
+        for span in spans:
+            result = previous.get(sentence_hash(span.text))
+            if result is None:
+                changed.append(span)
+            else:
+                reused[span.index] = result
+        return reused, changed
+
+    def store(
+        self,
+        uid: str,
+        document_id: str,
+        profile: str,
+        spans: List[SentenceSpan],
+        results: List[SentenceCheck],
+        truncated: Collection[int] = (),
+    ):
+        """Replace the document's results with those of its current sentences.
+
+        Spans whose index is in ``truncated`` (cut short by a deadline) are
+        left out, so the next check runs them again.
+        """
+        key = (uid, document_id)
+        previous = self._get(uid, document_id)
+        self._documents[key] = _Document(
+            profile,
+            {
+                sentence_hash(span.text): result
+                for span, result in zip(spans, results)
+                if span.index not in truncated
+            },
+            time.monotonic(),
+            billed=previous is not None and previous.billed,
+        )
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+
+    def claim_billing(self, uid: str, document_id: str) -> bool:
+        """True the first time a stored document's session is billed, False afterwards"""
+        document = self._get(uid, document_id)
+        if document is None or document.billed:
+            return False
+        document.billed = True
+        return True
+
+    def record(self, rechecked: int, reused: int):
+        self.rechecked += rechecked
+        self.reused += reused
+
+    def forget(self, uid: str, document_id: str):
+        self._documents.pop((uid, document_id), None)
+
+    def stats(self) -> dict:
+        total = self.rechecked + self.reused
+        return {
+            "documents": len(self._documents),
+            "rechecked_sentences": self.rechecked,
+            "reused_sentences": self.reused,
+            "reuse_rate": round(self.reused / total, 4) if total else 0.0,
+        }
+
+    def _get(self, uid: str, document_id: str) -> Optional[_Document]:
+        key = (uid, document_id)
+        document = self._documents.get(key)
+        if document is None:
+            return None
+        if time.monotonic() - document.touched_at > self.ttl_seconds:
+            del self._documents[key]
+            return None
+        return document
@@ -0,0 +1,96 @@
+import logging
+import os
+import threading
+from typing import List, Optional
+
+import torch
+from transformers import AutoModelForSeq2SeqLM
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+INFERENCE_BACKENDS = ("eager", "quantized", "onnx")
+
+# from_pretrained(low_cpu_mem_usage=True) patches module construction
+# process-wide to build on the meta device; two loads at once (e.g. both
+# model slots starting together) can leave either model with meta tensors
+_load_lock = threading.Lock()
+
+
+def load_seq2seq_model(model_path: str, backend: str = "eager", device: str = "cpu", onnx_dir: Optional[str] = None):
+    """Load a seq2seq model for generation with the selected inference backend.
+
+    PyTorch weights are loaded with ``low_cpu_mem_usage`` so they are not
+    materialized twice; safetensors checkpoints are memory-mapped.
+
+    - ``eager``: the PyTorch model as published (fp32).
+    - ``quantized``: PyTorch dynamic int8 quantization of all Linear layers (CPU only).
+    - ``onnx``: ONNX Runtime encoder/decoder sessions with past-key-value
+      caching via optimum. The export is written to ``onnx_dir`` when given and
+      reused on the next start.
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+
+    with _load_lock:
+        model = _load(model_path, backend, device, onnx_dir)
+    logger.info(f"✓ Loaded {model_path} with '{backend}' backend on {device}")
+    return model
+
+
+def _load(model_path: str, backend: str, device: str, onnx_dir: Optional[str]):
+    if backend == "eager":
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_path, low_cpu_mem_usage=True).to(device)
+        model.eval()
+
+    elif backend == "quantized":
+        if device != "cpu":
+            raise ValueError("Dynamic int8 quantization is only supported on CPU")
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_path, low_cpu_mem_usage=True)
+        model.eval()
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    else:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        provider = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+        if onnx_dir and os.path.isdir(onnx_dir) and os.listdir(onnx_dir):
+            model = ORTModelForSeq2SeqLM.from_pretrained(onnx_dir, use_cache=True, provider=provider)
+        else:
+            model = ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True, use_cache=True, provider=provider)
+            if onnx_dir:
+                model.save_pretrained(onnx_dir)
+                logger.info(f"ONNX export of {model_path} saved to {onnx_dir}")
+    return model
+
+
+def parity_report(
+    tokenizer,
+    reference,
+    candidate,
+    inputs: List[str],
+    device: str = "cpu",
+    add_special_tokens: bool = True,
+    **generate_kwargs
+) -> dict:
+    """Generate with both models on the same inputs and compare decoded outputs"""
+    mismatches = []
+    for text in inputs:
+        encoded = tokenizer(text, add_special_tokens=add_special_tokens, return_tensors="pt").to(device)
+        outputs = []
+        for model in (reference, candidate):
+            with torch.no_grad():
+                output_ids = model.generate(
+                    encoded["input_ids"],
+                    attention_mask=encoded["attention_mask"],
+                    **generate_kwargs
+                )
+            outputs.append(tokenizer.decode(output_ids[0], skip_special_tokens=True))
+        if outputs[0] != outputs[1]:
+            mismatches.append({"input": text, "reference": outputs[0], "candidate": outputs[1]})
+
+    return {
+        "total": len(inputs),
+        "matches": len(inputs) - len(mismatches),
+        "match_rate": (len(inputs) - len(mismatches)) / len(inputs) if inputs else 1.0,
+        "mismatches": mismatches,
+    }
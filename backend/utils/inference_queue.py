@@ -0,0 +1,86 @@
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+_STOP = object()
+
+# Lower values run first; interactive requests use the default
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+_PRIORITY_STOP = 1 << 30
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue cannot accept more work"""
+
+
+class InferenceWorker:
+    """Runs blocking inference calls on dedicated threads behind a bounded queue.
+
+    ``submit`` never blocks: when ``max_queue_size`` calls are already waiting
+    it raises ``QueueFullError`` so the caller can shed load immediately
+    instead of letting requests pile up. Waiting calls start in priority
+    order, then in submission order.
+    """
+
+    def __init__(self, max_queue_size: int = 32, num_threads: int = 1, name: str = "inference-worker"):
+        self.name = name
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue(maxsize=max(1, max_queue_size))
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, num_threads))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> Future:
+        """Queue ``fn(*args, **kwargs)``; raises QueueFullError if the queue is full"""
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((priority, next(self._seq), (fn, args, kwargs, future)))
+        except queue.Full:
+            raise QueueFullError(f"{self.name} queue is full") from None
+        return future
+
+    def depth(self) -> int:
+        """Number of calls waiting to start"""
+        return self._queue.qsize()
+
+    def in_flight(self) -> int:
+        """Number of calls currently running"""
+        return self._in_flight
+
+    def close(self, timeout: float = 5.0):
+        """Stop the worker threads once queued calls are processed"""
+        for _ in self._threads:
+            self._queue.put((_PRIORITY_STOP, next(self._seq), _STOP))
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            _, _, entry = self._queue.get()
+            if entry is _STOP:
+                return
+
+            fn, args, kwargs, future = entry
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self._lock:
+                self._in_flight += 1
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional
+from uuid import uuid4
+
+from utils.segmenter import sentence_spans
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+JOB_TYPES = ("grammar", "paraphrase")
+
+# Job lifecycle: queued -> running -> completed | failed
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+def split_into_chunks(text: str, max_chars: int = 1000) -> List[dict]:
+    """Group consecutive sentences into chunks of roughly ``max_chars`` characters.
+
+    Each chunk keeps the character offsets of its first and last sentence so
+    chunk results can be placed back into the document.
+    """
+    chunks = []
+    current = []
+    for span in sentence_spans(text):
+        if current and span.end - current[0].start > max_chars:
+            chunks.append(current)
+            current = []
+        current.append(span)
+    if current:
+        chunks.append(current)
+
+    return [
+        {
+            "index": i,
+            "start": spans[0].start,
+            "end": spans[-1].end,
+            "text": text[spans[0].start:spans[-1].end],
+        }
+        for i, spans in enumerate(chunks)
+    ]
+
+
+class JobStore:
+    """SQLite persistence for jobs and their per-chunk results"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        conn = self._connection()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, uid TEXT NOT NULL, type TEXT NOT NULL,"
+            " language TEXT NOT NULL, profile TEXT NOT NULL, text TEXT NOT NULL,"
+            " status TEXT NOT NULL, total_chunks INTEGER NOT NULL,"
+            " completed_chunks INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS job_chunks ("
+            " job_id TEXT NOT NULL, idx INTEGER NOT NULL, start INTEGER NOT NULL,"
+            " end INTEGER NOT NULL, text TEXT NOT NULL, result TEXT,"
+            " PRIMARY KEY (job_id, idx));"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, uid: str, job_type: str, language: str, profile: str, text: str, chunks: List[dict]) -> str:
+        job_id = str(uuid4())
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO jobs (id, uid, type, language, profile, text, status, total_chunks, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, uid, job_type, language, profile, text, STATUS_QUEUED, len(chunks), now, now)
+        )
+        conn.executemany(
+            "INSERT INTO job_chunks (job_id, idx, start, end, text) VALUES (?, ?, ?, ?, ?)",
+            [(job_id, c["index"], c["start"], c["end"], c["text"]) for c in chunks]
+        )
+        conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def chunks(self, job_id: str, completed_only: bool = False, after: int = -1) -> List[dict]:
+        query = "SELECT * FROM job_chunks WHERE job_id = ? AND idx > ?"
+        if completed_only:
+            query += " AND result IS NOT NULL"
+        rows = self._connection().execute(query + " ORDER BY idx", (job_id, after)).fetchall()
+        chunks = []
+        for row in rows:
+            chunk = dict(row)
+            chunk["index"] = chunk.pop("idx")
+            chunk["result"] = json.loads(chunk["result"]) if chunk["result"] else None
+            chunks.append(chunk)
+        return chunks
+
+    def save_chunk_result(self, job_id: str, index: int, result: dict):
+        conn = self._connection()
+        conn.execute(
+            "UPDATE job_chunks SET result = ? WHERE job_id = ? AND idx = ?",
+            (json.dumps(result, ensure_ascii=False), job_id, index)
+        )
+        conn.execute(
+            "UPDATE jobs SET completed_chunks = completed_chunks + 1, updated_at = ? WHERE id = ?",
+            (time.time(), job_id)
+        )
+        conn.commit()
+
+    def set_status(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        conn = self._connection()
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = COALESCE(?, result), error = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error, time.time(), job_id)
+        )
+        conn.commit()
+
+    def unfinished(self) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+            (STATUS_QUEUED, STATUS_RUNNING)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+
+class JobManager:
+    """Runs document jobs chunk by chunk in the background.
+
+    ``process_chunk(job, chunk)`` returns the JSON-serializable result of one
+    chunk and ``finalize(job, chunks)`` combines all chunk results into the
+    final result. Each chunk result is stored as soon as it is ready, so a
+    restarted process resumes a job from its first unfinished chunk. At most
+    ``max_concurrent_jobs`` jobs run at once.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        process_chunk: Callable[[dict, dict], Awaitable[dict]],
+        finalize: Callable[[dict, List[dict]], Awaitable[dict]],
+        max_concurrent_jobs: int = 1,
+        chunk_chars: int = 1000,
+    ):
+        self.store = store
+        self.process_chunk = process_chunk
+        self.finalize = finalize
+        self.chunk_chars = chunk_chars
+        self._slots = asyncio.Semaphore(max(1, max_concurrent_jobs))
+        self._tasks = {}
+
+    def submit(self, uid: str, job_type: str, text: str, language: str, profile: str) -> str:
+        chunks = split_into_chunks(text, self.chunk_chars)
+        job_id = self.store.create(uid, job_type, language, profile, text, chunks)
+        self._schedule(job_id)
+        logger.info(f"Queued {job_type} job {job_id} with {len(chunks)} chunks")
+        return job_id
+
+    def resume(self):
+        """Reschedule jobs left unfinished by a previous process"""
+        for job_id in self.store.unfinished():
+            logger.info(f"Resuming job {job_id}")
+            self._schedule(job_id)
+
+    async def shutdown(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def _schedule(self, job_id: str):
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str):
+        async with self._slots:
+            job = self.store.get(job_id)
+            self.store.set_status(job_id, STATUS_RUNNING)
+            try:
+                for chunk in self.store.chunks(job_id):
+                    if chunk["result"] is not None:
+                        continue
+                    result = await self.process_chunk(job, chunk)
+                    self.store.save_chunk_result(job_id, chunk["index"], result)
+
+                result = await self.finalize(job, self.store.chunks(job_id))
+                self.store.set_status(job_id, STATUS_COMPLETED, result=result)
+                logger.info(f"Job {job_id} completed")
+            except asyncio.CancelledError:
+                # Left as running so the next process resumes it
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+                self.store.set_status(job_id, STATUS_FAILED, error=str(e))
@@ -0,0 +1,280 @@
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond Hunspell lookups to multi-second beam searches
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def drain(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, float]):
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}" for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observations per label set"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts..., sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock seconds spent in the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def drain(self) -> Dict[LabelValues, list]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, list]):
+        with self._lock:
+            for key, other in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    self._values[key] = list(other)
+                else:
+                    self._values[key] = [a + b for a, b in zip(state, other)]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        lines = self.header()
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class Collected(_Metric):
+    """A gauge or counter read from existing state when the metrics are scraped.
+
+    ``fn`` returns a number, or (with ``labelnames``) a dict mapping tuples of
+    label values to numbers. Values that are None are skipped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], Union[float, Dict[LabelValues, Optional[float]], None]],
+        kind: str = "gauge",
+        labelnames: Iterable[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        values = self.fn()
+        if not self.labelnames:
+            values = {(): values}
+        return self.header() + [
+            f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items()) if value is not None
+        ]
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collect(self, name: str, documentation: str, fn: Callable, kind: str = "gauge", labelnames: Iterable[str] = ()) -> Collected:
+        return self.register(Collected(name, documentation, fn, kind, labelnames))
+
+    def drain(self) -> Dict[str, dict]:
+        """Take and reset the recorded counter and histogram values (for worker processes)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: values for metric in metrics
+            if isinstance(metric, (Counter, Histogram)) and (values := metric.drain())
+        }
+
+    def merge(self, snapshot: Dict[str, dict]):
+        """Add values drained from another registry with the same metrics"""
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served by /metrics
+REGISTRY = MetricsRegistry()
+
+# Model pipeline stages: grammar (hunspell, tokenize, generate, decode, diff)
+# and paraphrase (tokenize, generate, decode, transliterate)
+STAGE_SECONDS = REGISTRY.histogram(
+    "vakhya_stage_seconds", "Time spent in each inference pipeline stage", ("pipeline", "stage")
+)
+GENERATE_BATCH_SIZE = REGISTRY.histogram(
+    "vakhya_generate_batch_size", "Sentences per model.generate call", ("pipeline",), buckets=BATCH_SIZE_BUCKETS
+)
+BATCHER_BATCH_SIZE = REGISTRY.histogram(
+    "vakhya_batcher_batch_size", "Items per micro-batcher batch", ("batcher",), buckets=BATCH_SIZE_BUCKETS
+)
+FIRESTORE_SECONDS = REGISTRY.histogram(
+    "vakhya_firestore_seconds", "Time spent in each Firestore helper", ("helper",)
+)
+FIRESTORE_ERRORS = REGISTRY.counter(
+    "vakhya_firestore_errors_total", "Firestore helper calls that failed (HTTP errors excluded)", ("helper",)
+)
+
+
+def stage_timer(pipeline: str, stage: str):
+    """Context manager observing one pipeline stage in ``vakhya_stage_seconds``"""
+    return STAGE_SECONDS.time(pipeline=pipeline, stage=stage)
+
+
+def timed_firestore(fn):
+    """Decorator for async Firestore helpers: latency per helper name, and errors.
+
+    ``HTTPException`` is how helpers answer expected outcomes (missing
+    document, usage limit reached), so it is not counted as an error.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except HTTPException:
+            raise
+        except Exception:
+            FIRESTORE_ERRORS.inc(helper=fn.__name__)
+            raise
+        finally:
+            FIRESTORE_SECONDS.observe(time.perf_counter() - started, helper=fn.__name__)
+    return wrapper
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+# Model lifecycle: pending -> loading -> ready | failed
+MODEL_PENDING = "pending"
+MODEL_LOADING = "loading"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
+
+
+class ModelNotReadyError(Exception):
+    """Raised when a model is used before it has finished loading"""
+
+    def __init__(self, name: str, state: str):
+        super().__init__(f"{name} model is {state}")
+        self.name = name
+        self.state = state
+
+
+class ModelSlot:
+    """A model built by ``factory`` on a background thread.
+
+    ``start`` schedules the load and returns at once, so the app can serve
+    requests that do not need the model while it warms up; ``load`` builds
+    it on the calling thread instead. ``get`` returns the model or raises
+    ``ModelNotReadyError``; ``wait`` blocks until the load has finished.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.state = MODEL_PENDING
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._value = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        # Nothing to do when the model was already loaded with load()
+        if self.state == MODEL_PENDING:
+            self.state = MODEL_LOADING
+            self._task = asyncio.create_task(asyncio.to_thread(self.load))
+
+    def load(self):
+        self.state = MODEL_LOADING
+        started = time.perf_counter()
+        try:
+            self._value = self.factory()
+        except Exception as e:
+            self.state = MODEL_FAILED
+            self.error = str(e)
+            logger.error(f"✗ Failed to load {self.name} model: {e}", exc_info=True)
+            return
+        self.load_seconds = time.perf_counter() - started
+        self.state = MODEL_READY
+        logger.info(f"✓ {self.name} model ready in {self.load_seconds:.1f}s")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == MODEL_READY
+
+    def get(self):
+        if self.state != MODEL_READY:
+            raise ModelNotReadyError(self.name, self.state)
+        return self._value
+
+    async def wait(self):
+        """Wait for the load to finish; raises ModelNotReadyError if it failed"""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+        return self.get()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+        }
@@ -1,28 +1,48 @@
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-from indicnlp.transliterate.unicode_transliterate import UnicodeIndicTransliterator
+from transformers import AutoTokenizer
+from typing import List, Optional
+import torch
+from utils.cache import CorrectionCache, make_cache_key
+from utils.inference_backend import load_seq2seq_model
+from utils.metrics import GENERATE_BATCH_SIZE, stage_timer
+from utils.decoding_budget import adaptive_max_length, deadline_criteria, stopping_kwargs
+from utils.transliteration import Transliterator
+
+PARAPHRASE_MODEL = "ai4bharat/MultiIndicParaphraseGeneration"
+
+LANG_MAPPING = {
+    "hindi":"hi",
+    "tamil":"ta",
+    "telugu":"te",
+    "bengali":"bn",
+    "assamese":"as",
+    "gujarati":"gu",
+    "kannada":"kn",
+    "malayalam":"ml",
+    "marathi":"mr",
+    "punjabi":"pa",
+    "oriya":"or"
+}
 
 class Paraphraser():
 
-    def __init__(self):
-        self.tokenizer = AutoTokenizer.from_pretrained("ai4bharat/MultiIndicParaphraseGeneration", do_lower_case=False, use_fast=False, keep_accents=True)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained("ai4bharat/MultiIndicParaphraseGeneration")
+    def __init__(
+        self,
+        cache: Optional[CorrectionCache] = None,
+        inference_backend: str = "eager",
+        onnx_dir: Optional[str] = None,
+        model_name: str = PARAPHRASE_MODEL
+    ):
+        self.model_name = model_name
+        self.model_id = f"{self.model_name}:{inference_backend}"
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, do_lower_case=False, use_fast=False, keep_accents=True)
+        self.model = load_seq2seq_model(self.model_name, inference_backend, "cpu", onnx_dir)
+        self.cache = cache if cache is not None else CorrectionCache()
 
         self.bos_id = self.tokenizer._convert_token_to_id_with_added_voc("<s>")
         self.eos_id = self.tokenizer._convert_token_to_id_with_added_voc("</s>")
         self.pad_id = self.tokenizer._convert_token_to_id_with_added_voc("<pad>")
-        self.lang_mapping = {
-            "hindi":"hi",
-            "tamil":"ta",
-            "telugu":"te",
-            "bengali":"bn",
-            "assamese":"as",
-            "gujarati":"gu",
-            "kannada":"kn",
-            "malayalam":"ml",
-            "marathi":"mr",
-            "punjabi":"pa",
-            "oriya":"or"
-        }
+        self.lang_mapping = LANG_MAPPING
+        self.transliterator = Transliterator(LANG_MAPPING.values(), source="hi")
     # To get lang_id use any of ['<2as>', '<2bn>', '<2en>', '<2gu>', '<2hi>', '<2kn>', '<2ml>', '<2mr>', '<2or>', '<2pa>', '<2ta>', '<2te>']
     # Input should be "Sentence </s> <2xx>" where xx is the language code. Similarly, the output should be "<2yy> Sentence </s>".
     def get_langtag(self, language:str):
@@ -32,12 +52,18 @@ class Paraphraser():
         formated_input = f"{message.strip()} </s> {lang_code}"
         return self.tokenizer(formated_input,add_special_tokens=False,return_tensors="pt",padding=True).input_ids
 
+    def tokenize_batch(self,messages:List[str],lang_code:str ="<2hi>"):
+        """Tokenize several sentences into one right-padded batch"""
+        formated_inputs = [f"{message.strip()} </s> {lang_code}" for message in messages]
+        return self.tokenizer(formated_inputs,add_special_tokens=False,return_tensors="pt",padding=True)
+
     def generate_output_token(self,input_tokens,no_repeat_ngram_size=3,
                     encoder_no_repeat_ngram_size=3,num_beams=4,max_length=20,
-                    min_length=1,early_stopping=True,lang_code="<2hi>"):
+                    min_length=1,early_stopping=True,lang_code="<2hi>",attention_mask=None,stopping_criteria=None):
 
         return self.model.generate(
                                 input_tokens, 
+                                attention_mask=attention_mask,
                                 use_cache=True,
                                 no_repeat_ngram_size=no_repeat_ngram_size,
                                 encoder_no_repeat_ngram_size=encoder_no_repeat_ngram_size,
@@ -45,6 +71,7 @@ class Paraphraser():
                                 max_length=max_length, 
                                 min_length=min_length,
                                 early_stopping=early_stopping,
+                                stopping_criteria=stopping_criteria,
                                 pad_token_id=self.pad_id,
                                 bos_token_id=self.bos_id,
                                 eos_token_id=self.eos_id,
@@ -52,7 +79,48 @@ class Paraphraser():
 
     def decode_output(self,output_tokens, skip_special_tokens=True,clean_up_tokenization_spaces=True):
         return self.tokenizer.decode(output_tokens[0], skip_special_tokens=skip_special_tokens, clean_up_tokenization_spaces=clean_up_tokenization_spaces)
+
+    def decode_batch(self,output_tokens, skip_special_tokens=True,clean_up_tokenization_spaces=True):
+        return self.tokenizer.batch_decode(output_tokens, skip_special_tokens=skip_special_tokens, clean_up_tokenization_spaces=clean_up_tokenization_spaces)
+
+    def paraphrase_batch(self,messages:List[str],lang_code:str ="<2hi>",deadline:Optional[float]=None,**generate_kwargs) -> List[str]:
+        """Paraphrase several sentences; cache misses share a single padded generate call.
+
+        max_length is scaled down to the batch's input length, and generation
+        stops at ``deadline`` (``time.monotonic()`` seconds) with the best
+        hypotheses so far, which are then not cached.
+        """
+        keys = [make_cache_key(message, self.model_id, lang_code, **generate_kwargs) for message in messages]
+        results = {key: self.cache.get(key) for key in set(keys)}
+        misses = {key: message for key, message in zip(keys, messages) if results[key] is None}
+
+        if misses:
+            with stage_timer("paraphrase", "tokenize"):
+                inputs = self.tokenize_batch(list(misses.values()), lang_code=lang_code)
+            params = dict(generate_kwargs)
+            if "max_length" in params:
+                params["max_length"] = adaptive_max_length(inputs.input_ids.shape[1], params["max_length"])
+            criteria = deadline_criteria(deadline)
+            GENERATE_BATCH_SIZE.observe(len(misses), pipeline="paraphrase")
+            with torch.no_grad(), stage_timer("paraphrase", "generate"):
+                output_tokens = self.generate_output_token(
+                    inputs.input_ids,
+                    attention_mask=inputs.attention_mask,
+                    lang_code=lang_code,
+                    **params,
+                    **stopping_kwargs(criteria)
+                )
+            with stage_timer("paraphrase", "decode"):
+                decoded_batch = self.decode_batch(output_tokens)
+            truncated = criteria is not None and criteria.expired
+            for key, decoded in zip(misses, decoded_batch):
+                results[key] = decoded
+                if not truncated:
+                    self.cache.set(key, decoded)
+
+        return [results[key] for key in keys]
         
     def translate(self,text_in_devanagari:str,lang_tag:str):
-        return UnicodeIndicTransliterator.transliterate(text_in_devanagari, "hi", lang_tag)
+        with stage_timer("paraphrase", "transliterate"):
+            return self.transliterator.transliterate(text_in_devanagari, lang_tag)
 
@@ -0,0 +1,359 @@
+import inspect
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional
+
+import torch
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+# Messages from worker processes: (task_id, kind, payload)
+_RESULT = "result"
+_ITEM = "item"
+_DONE = "done"
+_ERROR = "error"
+# Stage metrics recorded in a worker since its last task, merged into the parent's registry
+_METRICS = "metrics"
+# Supervisor notices to the parent: (kind, worker index, pid, exit code, task_id)
+_CRASHED = "crashed"
+
+
+class WorkerCrashedError(Exception):
+    """Raised for calls that were running in a worker process that died"""
+
+
+def share_model_memory(obj: Any):
+    """Move the torch weights of ``obj`` (or its ``model`` attribute) into shared memory"""
+    module = obj if isinstance(obj, torch.nn.Module) else getattr(obj, "model", None)
+    if isinstance(module, torch.nn.Module):
+        module.share_memory()
+
+
+def cpu_slices(num_processes: int, threads_per_process: int) -> List[Optional[List[int]]]:
+    """CPUs each worker is pinned to, or None for all workers when there are too few CPUs"""
+    if not hasattr(os, "sched_getaffinity"):
+        return [None] * num_processes
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < num_processes * threads_per_process:
+        return [None] * num_processes
+    return [cpus[i * threads_per_process:(i + 1) * threads_per_process] for i in range(num_processes)]
+
+
+def _worker_main(models: Dict[str, Any], tasks, results, current, index: int, threads: int, cpus: Optional[List[int]]):
+    # The supervisor handles Ctrl-C and stops workers through the task queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    torch.set_num_threads(threads)
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    # Values inherited from the parent at fork time are already counted there
+    REGISTRY.drain()
+
+    while True:
+        message = tasks.get()
+        if message is None:
+            return
+        task_id, target, method, args, kwargs = message
+        # Written to shared memory right away, so the supervisor knows which
+        # call to fail even if this process dies before anything is sent
+        current[index] = task_id
+        try:
+            result = getattr(models[target], method)(*args, **kwargs)
+            if inspect.isgenerator(result):
+                for item in result:
+                    results.put((task_id, _ITEM, item))
+                results.put((task_id, _DONE, None))
+            else:
+                results.put((task_id, _RESULT, result))
+        except Exception as e:
+            # Exceptions that do not pickle are sent as text
+            try:
+                pickle.dumps(e)
+                results.put((task_id, _ERROR, e))
+            except Exception:
+                results.put((task_id, _ERROR, f"{type(e).__name__}: {e}"))
+        current[index] = -1
+        snapshot = REGISTRY.drain()
+        if snapshot:
+            results.put((task_id, _METRICS, snapshot))
+
+
+def _fork_worker(models, tasks, results, current, pids, index: int, threads: int, cpus: Optional[List[int]]) -> int:
+    pid = os.fork()
+    if pid:
+        pids[index] = pid
+        return pid
+    code = 0
+    try:
+        _worker_main(models, tasks, results, current, index, threads, cpus)
+        # Flush queued results before leaving without interpreter cleanup
+        results.close()
+        results.join_thread()
+    except BaseException:
+        logger.exception(f"Inference worker {index} failed")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def _supervisor_main(models: Dict[str, Any], tasks, results, notices, current, pids, threads: int, cpus: List[Optional[List[int]]]):
+    """Forks the workers and replaces any that die, from this single-threaded process"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parent = os.getppid()
+
+    def stop(signum=None, frame=None):
+        for pid in pids:
+            if pid > 0:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+
+    workers = {}
+    for index, worker_cpus in enumerate(cpus):
+        workers[_fork_worker(models, tasks, results, current, pids, index, threads, worker_cpus)] = index
+
+    while workers:
+        pid, status = os.wait()
+        index = workers.pop(pid, None)
+        if index is None:
+            continue
+        pids[index] = 0
+        exitcode = os.waitstatus_to_exitcode(status)
+        if exitcode == 0:
+            # Stopped by the None sentinel from close()
+            continue
+        if os.getppid() != parent:
+            # Nobody is left to send work or read results
+            stop()
+        task_id = current[index]
+        current[index] = -1
+        notices.send((_CRASHED, index, pid, exitcode, task_id))
+        workers[_fork_worker(models, tasks, results, current, pids, index, threads, cpus[index])] = index
+
+
+class InferenceProcessPool:
+    """Runs model methods in forked worker processes that share the parent's weights.
+
+    The models are loaded once in this process. ``start`` moves their torch
+    weights into shared memory and forks a supervisor process, which forks
+    ``num_processes`` workers; they all map the same weight pages instead of
+    holding a copy each. Every worker sets its intra-op thread count to
+    ``threads_per_process`` and, with ``cpu_affinity``, is pinned to its own
+    slice of CPUs.
+
+    Forking copies only the calling thread, so locks held by other threads,
+    open connections (SQLite, gRPC) and client state would reach the workers
+    in whatever state they were in. Call ``start`` before any of those
+    exist. Workers that die are replaced by the supervisor, which stays
+    single-threaded, never by this process; the call a dead worker was
+    running fails with ``WorkerCrashedError``.
+
+    ``call(target, method, *args)`` blocks the calling thread until a worker
+    has run ``getattr(models[target], method)(*args)``; ``iter_call`` streams
+    the items of a generator method.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        num_processes: int = 2,
+        threads_per_process: int = 1,
+        cpu_affinity: bool = True,
+    ):
+        self.models = models
+        self.num_processes = max(1, num_processes)
+        self.threads_per_process = max(1, threads_per_process)
+        self.cpu_affinity = cpu_affinity
+
+        self._ctx = multiprocessing.get_context("fork")
+        self._tasks = None
+        self._results = None
+        self._notices = None
+        self._supervisor: Optional[multiprocessing.Process] = None
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        # task_id -> Future for call(), queue.Queue for iter_call()
+        self._waiters: Dict[int, Any] = {}
+        # task_id each worker is running (-1 when idle), and worker pids (0 while down)
+        self._current = None
+        self._pids = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.calls = 0
+        self.failed_calls = 0
+        self.restarts = 0
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None and not self._stopping
+
+    def start(self):
+        for model in self.models.values():
+            share_model_memory(model)
+
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        notices_in, notices_out = self._ctx.Pipe(duplex=False)
+        self._notices = notices_in
+        self._current = self._ctx.Array("q", [-1] * self.num_processes, lock=False)
+        self._pids = self._ctx.Array("q", [0] * self.num_processes, lock=False)
+        cpus = (
+            cpu_slices(self.num_processes, self.threads_per_process)
+            if self.cpu_affinity else [None] * self.num_processes
+        )
+        self._supervisor = self._ctx.Process(
+            target=_supervisor_main,
+            args=(
+                self.models, self._tasks, self._results, notices_out, self._current, self._pids,
+                self.threads_per_process, cpus,
+            ),
+            name="inference-supervisor",
+            daemon=True,
+        )
+        self._supervisor.start()
+        notices_out.close()
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name="inference-pool-dispatch", daemon=True)
+        self._dispatcher.start()
+        logger.info(
+            f"✓ Inference pool started: {self.num_processes} processes x "
+            f"{self.threads_per_process} threads, affinity {cpus}"
+        )
+
+    def call(self, target: str, method: str, *args, **kwargs) -> Any:
+        future: Future = Future()
+        self._submit(future, target, method, args, kwargs)
+        return future.result()
+
+    def iter_call(self, target: str, method: str, *args, **kwargs) -> Iterator[Any]:
+        items: "queue.Queue" = queue.Queue()
+        task_id = self._submit(items, target, method, args, kwargs)
+        try:
+            while True:
+                kind, payload = items.get()
+                if kind == _ITEM:
+                    yield payload
+                elif kind == _DONE:
+                    return
+                else:
+                    raise payload
+        finally:
+            # Later items of an abandoned stream are dropped by the dispatcher
+            with self._lock:
+                self._waiters.pop(task_id, None)
+
+    def _submit(self, waiter, target, method, args, kwargs) -> int:
+        if not self.running:
+            raise RuntimeError("Inference pool is not running")
+        task_id = next(self._ids)
+        with self._lock:
+            self._waiters[task_id] = waiter
+        self.calls += 1
+        self._tasks.put((task_id, target, method, args, kwargs))
+        return task_id
+
+    def _dispatch(self):
+        next_check = time.monotonic() + 1.0
+        while not self._stopping:
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + 1.0
+            try:
+                task_id, kind, payload = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+            if kind == _METRICS:
+                REGISTRY.merge(payload)
+                continue
+
+            with self._lock:
+                if kind == _ITEM:
+                    waiter = self._waiters.get(task_id)
+                else:
+                    waiter = self._waiters.pop(task_id, None)
+
+            if waiter is None:
+                continue
+            if kind == _ERROR:
+                self.failed_calls += 1
+                self._resolve(waiter, _ERROR, payload if isinstance(payload, Exception) else RuntimeError(payload))
+            else:
+                self._resolve(waiter, kind, payload)
+
+    def _resolve(self, waiter, kind, payload):
+        if isinstance(waiter, Future):
+            if kind == _ERROR:
+                waiter.set_exception(payload)
+            else:
+                waiter.set_result(payload)
+        else:
+            waiter.put((kind, payload))
+
+    def _fail(self, task_id: int, error: Exception):
+        with self._lock:
+            waiter = self._waiters.pop(task_id, None)
+        if waiter is not None:
+            self.failed_calls += 1
+            self._resolve(waiter, _ERROR, error)
+
+    def _check_workers(self):
+        """Fail the calls of workers the supervisor replaced, and everything if it died"""
+        while self._notices.poll():
+            try:
+                _, index, pid, exitcode, task_id = self._notices.recv()
+            except EOFError:
+                # The supervisor closed its end by exiting
+                break
+            logger.error(f"Inference worker inference-{index} (pid {pid}) exited with {exitcode}; restarted")
+            self.restarts += 1
+            self._fail(task_id, WorkerCrashedError(f"inference-{index} exited with {exitcode}"))
+
+        if self._stopping or self._supervisor.is_alive():
+            return
+        # Restarting it would fork this process, which is no longer safe to fork
+        logger.critical(f"Inference supervisor exited with {self._supervisor.exitcode}; inference pool stopped")
+        self._stopping = True
+        with self._lock:
+            task_ids = list(self._waiters)
+        for task_id in task_ids:
+            self._fail(task_id, WorkerCrashedError("inference supervisor exited"))
+
+    def close(self, timeout: float = 5.0):
+        if self._dispatcher is None:
+            return
+        self._stopping = True
+        for _ in range(self.num_processes):
+            self._tasks.put(None)
+        self._supervisor.join(timeout=timeout)
+        if self._supervisor.is_alive():
+            self._supervisor.terminate()
+            self._supervisor.join(timeout=timeout)
+        self._dispatcher.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        supervised = self._supervisor is not None and self._supervisor.is_alive()
+        return {
+            "processes": self.num_processes,
+            "alive": sum(1 for pid in self._pids if pid > 0) if supervised else 0,
+            "threads_per_process": self.threads_per_process,
+            "in_flight": len(self._waiters),
+            "calls": self.calls,
+            "failed_calls": self.failed_calls,
+            "restarts": self.restarts,
+        }
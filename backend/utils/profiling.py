@@ -0,0 +1,82 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from typing import Any, Callable
+from uuid import uuid4
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+
+class RequestProfiler:
+    """Runs single calls under cProfile and the PyTorch profiler and saves the traces.
+
+    ``run(trace_id, fn, *args)`` calls ``fn`` on the current thread with both
+    profilers active and writes, under ``out_dir``:
+
+    - ``{trace_id}.pstats``: cProfile stats (``python -m pstats`` or snakeviz)
+    - ``{trace_id}.torch.json``: Chrome trace of the torch operators, with the
+      Python stack that issued them (chrome://tracing or Perfetto)
+    - ``{trace_id}.txt``: both summaries, slowest Python functions by
+      cumulative time and slowest operators by self CPU time
+
+    Profiling hooks are process-wide, so profiled calls run one at a time.
+    Nothing here is touched unless a request asks to be profiled.
+    """
+
+    def __init__(self, out_dir: str, top: int = 40):
+        self.out_dir = out_dir
+        self.top = top
+        self._lock = threading.Lock()
+        self.traces = 0
+
+    @staticmethod
+    def new_trace_id() -> str:
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:8]}"
+
+    def run(self, trace_id: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        import torch
+        from torch.profiler import ProfilerActivity, profile, record_function
+
+        with self._lock:
+            python_profile = cProfile.Profile()
+            torch_profile = profile(activities=[ProfilerActivity.CPU], record_shapes=True, with_stack=True)
+            started = time.perf_counter()
+            elapsed = 0.0
+            try:
+                with torch_profile, record_function(f"request {trace_id}"):
+                    python_profile.enable()
+                    try:
+                        return fn(*args, **kwargs)
+                    finally:
+                        python_profile.disable()
+                        elapsed = time.perf_counter() - started
+            finally:
+                # Written once both profilers have stopped (failed calls included)
+                self._save(trace_id, python_profile, torch_profile, elapsed, torch.__version__)
+
+    def _save(self, trace_id: str, python_profile, torch_profile, elapsed: float, torch_version: str):
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            base = os.path.join(self.out_dir, trace_id)
+
+            python_profile.dump_stats(f"{base}.pstats")
+            torch_profile.export_chrome_trace(f"{base}.torch.json")
+
+            summary = io.StringIO()
+            summary.write(json.dumps({"trace_id": trace_id, "elapsed_s": round(elapsed, 4), "torch": torch_version}) + "\n\n")
+            pstats.Stats(python_profile, stream=summary).sort_stats("cumulative").print_stats(self.top)
+            summary.write("\n")
+            summary.write(torch_profile.key_averages().table(sort_by="self_cpu_time_total", row_limit=self.top))
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(summary.getvalue())
+        except Exception as e:
+            logger.error(f"Failed to save profile {trace_id}: {e}", exc_info=True)
+            return
+
+        self.traces += 1
+        logger.info(f"Profile {trace_id} saved to {self.out_dir} ({elapsed:.2f}s)")
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from google.cloud import firestore
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+# action type -> (monthly counter field in usage, lifetime total field)
+USAGE_FIELDS = {
+    "paraphrase": ("paraphraseCount", "totalParaphrases"),
+    "grammar": ("grammarCheckCount", "totalGrammarChecks"),
+}
+
+RESET_DAYS = 30
+
+
+class _UserQuota:
+    __slots__ = (
+        "exists", "plan", "usage", "last_reset", "loaded_at",
+        "pending_usage", "pending_totals", "reset_pending", "failures",
+    )
+
+    def __init__(self):
+        self.exists = False
+        self.plan = "free"
+        self.usage = {action: 0 for action in USAGE_FIELDS}
+        self.last_reset: Optional[datetime] = None
+        self.loaded_at = 0.0
+        self.pending_usage = {action: 0 for action in USAGE_FIELDS}
+        self.pending_totals = {action: 0 for action in USAGE_FIELDS}
+        self.reset_pending = False
+        self.failures = 0
+
+    def has_pending(self) -> bool:
+        return self.reset_pending or any(self.pending_totals.values())
+
+
+class QuotaManager:
+    """Per-user plan and usage counters kept in memory and reconciled to Firestore.
+
+    A user's document is read at most once per ``ttl_seconds``; checks in
+    between are answered from memory, including the 30-day ``lastReset``
+    rollover. Increments are applied locally and written every
+    ``reconcile_interval`` seconds as ``Increment`` transforms in one batch,
+    so counts from several workers add up. Between reads, a worker does not
+    see other workers' increments, so a free user can overshoot a limit by
+    at most what the other workers served within one TTL. When a batch
+    fails it is split until the failing users are isolated, so the others
+    are still written; a user whose update fails ``max_retries`` times in a
+    row has its pending counts dropped.
+
+    With a ``UserProfileCache`` as ``profiles``, documents are read through it
+    and local rollovers are mirrored into it, so a quota reload also refreshes
+    the cached profile.
+    """
+
+    def __init__(
+        self,
+        db,
+        limits: Dict[str, int],
+        ttl_seconds: float = 60.0,
+        reconcile_interval: float = 5.0,
+        profiles=None,
+        max_retries: int = 5,
+    ):
+        self.db = db
+        self.limits = limits
+        self.profiles = profiles
+        self.ttl_seconds = ttl_seconds
+        self.reconcile_interval = reconcile_interval
+        self.max_retries = max(1, max_retries)
+
+        self._users: Dict[str, _UserQuota] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.reads = 0
+        self.hits = 0
+        self.reconciles = 0
+        self.failed_reconciles = 0
+        self.dropped_users = 0
+
+    # ----------------------------
+    # Hot path
+    # ----------------------------
+    async def check(self, uid: str, action_type: str) -> tuple[bool, int, str]:
+        """Returns: (can_use: bool, remaining: int, plan: str); remaining is -1 when unlimited"""
+        quota = await self._get(uid)
+
+        if not quota.exists:
+            return False, 0, 'free'
+
+        # Premium users have unlimited access
+        if quota.plan == 'premium':
+            return True, -1, quota.plan
+
+        self._roll_over(uid, quota)
+
+        if action_type not in USAGE_FIELDS:
+            return False, 0, quota.plan
+
+        current_count = quota.usage[action_type]
+        remaining = self.limits[action_type] - current_count
+        return current_count < self.limits[action_type], remaining, quota.plan
+
+    def increment(self, uid: str, action_type: str):
+        """Count one use locally; it reaches Firestore at the next reconcile"""
+        if action_type not in USAGE_FIELDS:
+            return
+        quota = self._users.get(uid)
+        if quota is None:
+            quota = self._users[uid] = _UserQuota()
+            quota.exists = True  # not loaded yet; the next check reads the document
+        quota.usage[action_type] += 1
+        quota.pending_usage[action_type] += 1
+        quota.pending_totals[action_type] += 1
+
+    def invalidate(self, uid: str):
+        """Force the next check to re-read the user (pending increments are kept)"""
+        quota = self._users.get(uid)
+        if quota is not None:
+            quota.loaded_at = 0.0
+
+    def snapshot(self, uid: str) -> Optional[dict]:
+        """Locally known plan and usage for a user, or None when not cached"""
+        quota = self._users.get(uid)
+        if quota is None or not quota.loaded_at:
+            return None
+        return {"plan": quota.plan, "usage": dict(quota.usage), "lastReset": quota.last_reset}
+
+    def metrics(self) -> dict:
+        return {
+            "users": len(self._users),
+            "reads": self.reads,
+            "hits": self.hits,
+            "pending_users": sum(1 for q in self._users.values() if q.has_pending()),
+            "reconciles": self.reconciles,
+            "failed_reconciles": self.failed_reconciles,
+            "dropped_users": self.dropped_users,
+        }
+
+    async def _get(self, uid: str) -> _UserQuota:
+        quota = self._users.get(uid)
+        if quota is not None and time.monotonic() - quota.loaded_at < self.ttl_seconds:
+            self.hits += 1
+            return quota
+
+        if self.profiles is not None:
+            user_data = await self.profiles.fetch(uid)
+        else:
+            user_doc = await self.db.collection('users').document(uid).get()
+            user_data = user_doc.to_dict() if user_doc.exists else None
+        self.reads += 1
+
+        # Re-read while another coroutine may have added to the same entry
+        quota = self._users.setdefault(uid, _UserQuota())
+        quota.loaded_at = time.monotonic()
+        quota.exists = user_data is not None
+        if user_data is None:
+            return quota
+
+        usage = user_data.get('usage', {})
+        quota.plan = user_data.get('plan', 'free')
+        if not quota.reset_pending:
+            quota.last_reset = usage.get('lastReset')
+            for action, (count_field, _) in USAGE_FIELDS.items():
+                # Increments not yet written are added on top of the stored count
+                quota.usage[action] = usage.get(count_field, 0) + quota.pending_usage[action]
+        if self.profiles is not None and quota.has_pending():
+            # The fetched document does not include what is still waiting to be reconciled
+            if quota.reset_pending:
+                self.profiles.reset_usage(uid, quota.last_reset)
+            for action in USAGE_FIELDS:
+                self.profiles.apply_usage(uid, action, quota.pending_usage[action], quota.pending_totals[action])
+        return quota
+
+    def _roll_over(self, uid: str, quota: _UserQuota):
+        """Start a new monthly period once lastReset is RESET_DAYS old"""
+        if not isinstance(quota.last_reset, datetime):
+            return
+        last_reset = quota.last_reset
+        if last_reset.tzinfo is None:
+            last_reset = last_reset.replace(tzinfo=timezone.utc)
+        if (datetime.now(timezone.utc) - last_reset).days < RESET_DAYS:
+            return
+
+        quota.last_reset = datetime.now(timezone.utc)
+        quota.usage = {action: 0 for action in USAGE_FIELDS}
+        quota.pending_usage = {action: 0 for action in USAGE_FIELDS}
+        quota.reset_pending = True
+        if self.profiles is not None:
+            self.profiles.reset_usage(uid, quota.last_reset)
+
+    # ----------------------------
+    # Reconciliation
+    # ----------------------------
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.reconcile()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            await self.reconcile()
+            self._evict()
+
+    def _evict(self):
+        """Forget users that are expired and have nothing left to write"""
+        now = time.monotonic()
+        for uid in [
+            uid for uid, q in self._users.items()
+            if not q.has_pending() and now - q.loaded_at >= self.ttl_seconds
+        ]:
+            del self._users[uid]
+
+    async def reconcile(self):
+        """Write pending increments and period resets in batches of at most 500 users"""
+        pending = [(uid, q) for uid, q in self._users.items() if q.has_pending()]
+        for start in range(0, len(pending), 500):
+            await self._commit(pending[start:start + 500])
+
+    async def _commit(self, entries):
+        written = []
+        for uid, quota in entries:
+            update = {}
+            reset = quota.reset_pending
+            usage_delta = dict(quota.pending_usage)
+            total_delta = dict(quota.pending_totals)
+
+            for action, (count_field, total_field) in USAGE_FIELDS.items():
+                if reset:
+                    update[f'usage.{count_field}'] = quota.usage[action]
+                elif usage_delta[action]:
+                    update[f'usage.{count_field}'] = firestore.Increment(usage_delta[action])
+                if total_delta[action]:
+                    update[total_field] = firestore.Increment(total_delta[action])
+            if reset:
+                update['usage.lastReset'] = quota.last_reset
+
+            written.append((uid, quota, update, reset, usage_delta, total_delta))
+        await self._write(written)
+
+    async def _write(self, written):
+        """Commit the updates in one batch, splitting it to isolate users that fail"""
+        batch = self.db.batch()
+        for uid, _, update, _, _, _ in written:
+            batch.update(self.db.collection('users').document(uid), update)
+
+        try:
+            await batch.commit()
+        except Exception as e:
+            self.failed_reconciles += 1
+            if len(written) > 1:
+                logger.warning(f"Usage reconcile for {len(written)} users failed, splitting: {e}")
+                middle = len(written) // 2
+                await self._write(written[:middle])
+                await self._write(written[middle:])
+                return
+
+            uid, quota = written[0][:2]
+            quota.failures += 1
+            if quota.failures < self.max_retries:
+                logger.warning(f"Usage reconcile for user {uid} failed: {e}")
+                return
+            # Give up on what was pending so the entry can be evicted
+            logger.error(f"Dropping pending usage of user {uid} after {quota.failures} failed reconciles: {e}")
+            self.dropped_users += 1
+        else:
+            self.reconciles += 1
+
+        # Only subtract what was written (or dropped); increments made during the commit stay pending
+        for _, quota, _, reset, usage_delta, total_delta in written:
+            quota.failures = 0
+            if reset:
+                quota.reset_pending = False
+            for action in USAGE_FIELDS:
+                quota.pending_usage[action] -= usage_delta[action]
+                quota.pending_totals[action] -= total_delta[action]
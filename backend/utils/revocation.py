@@ -0,0 +1,169 @@
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+REVOCATION_BACKENDS = ("local", "firestore")
+
+
+def _compact_key(jti: str) -> bytes:
+    """16 raw bytes for uuid jtis (what create_*_token issues), the UTF-8 string otherwise"""
+    try:
+        return uuid.UUID(jti).bytes
+    except ValueError:
+        return jti.encode()
+
+
+class LocalRevocationStore:
+    """Revoked token ids held in this process until the token itself expires.
+
+    Entries map a compact jti to its ``exp`` (epoch seconds) and a min-heap
+    ordered by ``exp`` lets sweeps drop expired entries without scanning the
+    whole map. Sweeps run at most every ``sweep_interval`` seconds, piggybacked
+    on revoke/check calls. Memory is therefore bounded by the number of
+    revocations within one refresh-token lifetime. Past ``max_entries`` a
+    store that is the only record of its revocations keeps them anyway and
+    logs an error, since dropping one would make a revoked token valid again.
+    With ``evict_when_full`` (a cache in front of a shared backend that still
+    holds every revocation) the soonest-expiring entries are dropped instead.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0, max_entries: int = 1_000_000, evict_when_full: bool = False):
+        self.sweep_interval = sweep_interval
+        self.max_entries = max(1, max_entries)
+        self.evict_when_full = evict_when_full
+        self._expiry: Dict[bytes, int] = {}
+        self._heap: List[Tuple[int, bytes]] = []
+        self._next_sweep = 0.0
+
+        self.revocations = 0
+        self.swept = 0
+        self.evicted = 0
+        self.over_capacity = 0
+
+    async def revoke(self, jti: str, expires_at: int):
+        self.add(jti, expires_at)
+
+    async def is_revoked(self, jti: str) -> bool:
+        return self.contains(jti)
+
+    def add(self, jti: str, expires_at: int):
+        now = time.time()
+        if expires_at <= now:
+            return  # already unusable
+        self._maybe_sweep(now)
+
+        key = _compact_key(jti)
+        if key not in self._expiry:
+            self.revocations += 1
+        self._expiry[key] = max(expires_at, self._expiry.get(key, 0))
+        heapq.heappush(self._heap, (self._expiry[key], key))
+
+        if len(self._expiry) > self.max_entries:
+            self._make_room(now)
+
+    def _make_room(self, now: float):
+        """Bring the store back under ``max_entries`` without losing a revocation it alone holds"""
+        self.sweep(now)
+        if not self.evict_when_full:
+            if len(self._expiry) > self.max_entries:
+                self.over_capacity += 1
+                if len(self._expiry) == self.max_entries + 1:
+                    logger.error(
+                        f"Revocation store over its {self.max_entries} entry cap; keeping every unexpired "
+                        "revocation (use the shared revocation backend to bound memory)"
+                    )
+            return
+
+        while len(self._expiry) > self.max_entries:
+            expires_at, oldest = heapq.heappop(self._heap)
+            # Skip stale heap entries left by a later re-revoke of the same jti
+            if self._expiry.get(oldest) == expires_at:
+                del self._expiry[oldest]
+                self.evicted += 1
+                logger.warning("Revocation cache full; dropped the soonest-expiring entry")
+
+    def contains(self, jti: str) -> bool:
+        now = time.time()
+        self._maybe_sweep(now)
+        expires_at = self._expiry.get(_compact_key(jti))
+        return expires_at is not None and expires_at > now
+
+    def sweep(self, now: float = None):
+        """Drop every entry whose token has expired"""
+        now = time.time() if now is None else now
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._heap)
+            # Skip stale heap entries left by a later re-revoke of the same jti
+            if self._expiry.get(key) == expires_at:
+                del self._expiry[key]
+                self.swept += 1
+        self._next_sweep = now + self.sweep_interval
+
+    def _maybe_sweep(self, now: float):
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local",
+            "entries": len(self._expiry),
+            "revocations": self.revocations,
+            "swept": self.swept,
+            "evicted": self.evicted,
+            "over_capacity": self.over_capacity,
+        }
+
+
+class FirestoreRevocationStore:
+    """Revoked token ids shared by all workers through a Firestore collection.
+
+    Each revocation is a ``{collection}/{jti}`` document with an ``expiresAt``
+    timestamp; configure a Firestore TTL policy on that field so expired
+    documents are deleted server side. Revocations seen by this process are
+    also kept in a ``LocalRevocationStore``, so repeated checks of a revoked
+    token are answered from memory; that cache may evict when full, since an
+    evicted revocation is read back from Firestore.
+    """
+
+    def __init__(self, db, collection: str = "revokedTokens", local: LocalRevocationStore = None):
+        self.db = db
+        self.collection = collection
+        self.local = local or LocalRevocationStore(evict_when_full=True)
+        self.reads = 0
+
+    async def revoke(self, jti: str, expires_at: int):
+        if expires_at <= time.time():
+            return
+        self.local.add(jti, expires_at)
+        await self.db.collection(self.collection).document(jti).set({
+            'expiresAt': datetime.fromtimestamp(expires_at, tz=timezone.utc)
+        })
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.local.contains(jti):
+            return True
+
+        doc = await self.db.collection(self.collection).document(jti).get()
+        self.reads += 1
+        if not doc.exists:
+            return False
+
+        # TTL deletion is not immediate, so check expiry here as well
+        expires_at = doc.to_dict().get('expiresAt')
+        if not isinstance(expires_at, datetime):
+            return True
+        expires_ts = int(expires_at.timestamp())
+        if expires_ts <= time.time():
+            return False
+        self.local.add(jti, expires_ts)
+        return True
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        stats.update({"backend": "firestore", "reads": self.reads})
+        return stats
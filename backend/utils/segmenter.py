@@ -0,0 +1,38 @@
+import re
+from bisect import bisect_right
+from typing import Iterator, List, NamedTuple, Optional
+
+# A sentence is a run of non-terminators followed by an optional terminator
+# (danda, full stop, exclamation or question mark)
+SENTENCE_PATTERN = re.compile(r'[^।.!?]+[।.!?]?')
+
+
+class SentenceSpan(NamedTuple):
+    """A stripped sentence and its [start, end) character offsets in the source text"""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def iter_sentence_spans(text: str) -> Iterator[SentenceSpan]:
+    """Yield non-empty sentences of ``text`` with surrounding whitespace removed"""
+    index = 0
+    for match in SENTENCE_PATTERN.finditer(text):
+        raw = match.group(0)
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        start = match.start() + (len(raw) - len(raw.lstrip()))
+        yield SentenceSpan(index, start, start + len(stripped), stripped)
+        index += 1
+
+
+def sentence_spans(text: str) -> List[SentenceSpan]:
+    return list(iter_sentence_spans(text))
+
+
+def find_span(spans: List[SentenceSpan], pos: int) -> Optional[SentenceSpan]:
+    """Return the span containing ``pos`` (or the one before it, for inter-sentence whitespace)"""
+    i = bisect_right([span.start for span in spans], pos) - 1
+    return spans[i] if i >= 0 else None
@@ -0,0 +1,87 @@
+import logging
+from functools import lru_cache
+from typing import List
+
+logger = logging.getLogger("HindiGrammarChecker")
+
+SPELLING_BACKENDS = ("symspell", "hunspell")
+
+
+def load_dictionary_words(dic_path: str) -> List[str]:
+    """Read the stems of a Hunspell .dic file (first line is the entry count)"""
+    words = []
+    with open(dic_path, encoding="utf-8") as f:
+        next(f, None)
+        for line in f:
+            word = line.split("/", 1)[0].strip()
+            if word and not word.startswith("#"):
+                words.append(word)
+    return words
+
+
+class SpellingSuggester:
+    """Memoized spell checks and suggestions for single words.
+
+    ``spell`` always uses Hunspell (affix-aware and cheap). ``suggest`` uses a
+    SymSpell symmetric-delete index built from the dictionary stems when
+    ``backend="symspell"``, or Hunspell's own (slow) suggest when
+    ``backend="hunspell"``. Both results are memoized per word.
+    """
+
+    def __init__(
+        self,
+        hobj,
+        dic_path: str,
+        backend: str = "symspell",
+        max_edit_distance: int = 2,
+        cache_size: int = 50000,
+    ):
+        if backend not in SPELLING_BACKENDS:
+            raise ValueError(f"Unknown spelling backend '{backend}', expected one of {SPELLING_BACKENDS}")
+
+        self.hobj = hobj
+        self.max_edit_distance = max_edit_distance
+        self.symspell = None
+
+        if backend == "symspell":
+            try:
+                self.symspell = self._build_symspell(dic_path)
+            except Exception as e:
+                logger.warning(f"SymSpell index unavailable ({e}), falling back to Hunspell suggest")
+                backend = "hunspell"
+        self.backend = backend
+
+        self.spell = lru_cache(maxsize=cache_size)(self._spell)
+        self.suggest = lru_cache(maxsize=cache_size)(self._suggest)
+
+    def _build_symspell(self, dic_path: str):
+        from symspellpy import SymSpell
+
+        symspell = SymSpell(max_dictionary_edit_distance=self.max_edit_distance)
+        words = load_dictionary_words(dic_path)
+        for word in words:
+            symspell.create_dictionary_entry(word, 1)
+        logger.info(f"SymSpell index built from {len(words)} dictionary words")
+        return symspell
+
+    def _spell(self, word: str) -> bool:
+        return bool(self.hobj.spell(word))
+
+    def _suggest(self, word: str) -> tuple:
+        if self.symspell is None:
+            return tuple(self.hobj.suggest(word))
+
+        from symspellpy import Verbosity
+
+        return tuple(
+            item.term for item in self.symspell.lookup(
+                word, Verbosity.CLOSEST, max_edit_distance=self.max_edit_distance
+            )
+        )
+
+    def cache_info(self) -> dict:
+        return {
+            "backend": self.backend,
+            "spell": self.spell.cache_info()._asdict(),
+            "suggest": self.suggest.cache_info()._asdict(),
+        }
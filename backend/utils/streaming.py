@@ -0,0 +1,61 @@
+import asyncio
+import json
+import threading
+from typing import Any, Callable
+
+from utils.inference_queue import InferenceWorker
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # keep nginx from buffering the stream
+}
+
+_DONE = object()
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class WorkerStream:
+    """Runs a blocking generator as a single InferenceWorker job and yields its items on the event loop.
+
+    The job is submitted in the constructor, so a full queue raises
+    ``QueueFullError`` before any response is started. ``cancel`` makes the
+    generator stop at its next item (e.g. when the client disconnects).
+    """
+
+    def __init__(self, worker: InferenceWorker, iter_fn: Callable, *args, **kwargs):
+        self._loop = asyncio.get_running_loop()
+        self._items: asyncio.Queue = asyncio.Queue()
+        self._cancelled = threading.Event()
+        self._future = worker.submit(self._run, iter_fn, args, kwargs)
+
+    def cancel(self):
+        self._cancelled.set()
+        self._future.cancel()
+
+    def _put(self, item):
+        try:
+            self._loop.call_soon_threadsafe(self._items.put_nowait, item)
+        except RuntimeError:
+            pass  # event loop already closed
+
+    def _run(self, iter_fn, args, kwargs):
+        try:
+            for item in iter_fn(*args, **kwargs):
+                if self._cancelled.is_set():
+                    return
+                self._put(item)
+        finally:
+            self._put(_DONE)
+
+    async def __aiter__(self):
+        while True:
+            item = await self._items.get()
+            if item is _DONE:
+                break
+            yield item
+        # Re-raise anything the generator failed with
+        await asyncio.wrap_future(self._future)
@@ -0,0 +1,53 @@
+import logging
+from typing import Dict, Iterable
+
+from indicnlp import langinfo
+from indicnlp.transliterate.unicode_transliterate import UnicodeIndicTransliterator
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+
+def build_table(source: str, target: str) -> Dict[int, str]:
+    """``str.translate`` table equivalent to indic-nlp's ``source`` -> ``target`` transliteration.
+
+    indic-nlp maps each character on its own (codepoint offset within the
+    script block, plus Tamil's substitutions and the danda exceptions), so
+    running it over every character of the source block once gives the full
+    mapping, exceptions included. Only characters that change are stored.
+    """
+    base = langinfo.SCRIPT_RANGES[source][0]
+    table = {}
+    for offset in range(langinfo.COORDINATED_RANGE_START_INCLUSIVE, langinfo.COORDINATED_RANGE_END_INCLUSIVE + 1):
+        char = chr(base + offset)
+        mapped = UnicodeIndicTransliterator.transliterate(char, source, target)
+        if mapped != char:
+            table[ord(char)] = mapped
+    return table
+
+
+class Transliterator:
+    """Script conversion from ``source`` through precomputed ``str.translate`` tables.
+
+    Tables are built once for the given target language codes. Pairs without
+    a table (other sources, or targets such as Sinhala that indic-nlp
+    converts in several steps) fall back to ``UnicodeIndicTransliterator``.
+    """
+
+    # indic-nlp routes these through an intermediate script, not a per-character map
+    UNTABLED = {"si"}
+
+    def __init__(self, targets: Iterable[str], source: str = "hi"):
+        self.source = source
+        self.tables: Dict[str, Dict[int, str]] = {}
+        for target in set(targets):
+            if target in langinfo.SCRIPT_RANGES and target not in self.UNTABLED:
+                self.tables[target] = build_table(source, target)
+        logger.info(f"Transliteration tables built for {sorted(self.tables)}")
+
+    def transliterate(self, text: str, target: str, source: str = None) -> str:
+        source = source or self.source
+        table = self.tables.get(target) if source == self.source else None
+        if table is None:
+            return UnicodeIndicTransliterator.transliterate(text, source, target)
+        # Same-script pairs (e.g. hi -> mr) have an empty table
+        return text.translate(table) if table else text
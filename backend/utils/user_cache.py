@@ -0,0 +1,108 @@
+import copy
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from utils.metrics import timed_firestore
+from utils.quota import USAGE_FIELDS
+
+_MISSING = object()
+
+
+@timed_firestore
+async def read_user_document(db, uid: str) -> Optional[dict]:
+    """The ``users/{uid}`` document from Firestore; None if the user does not exist"""
+    user_doc = await db.collection('users').document(uid).get()
+    return user_doc.to_dict() if user_doc.exists else None
+
+
+class UserProfileCache:
+    """Per-process LRU cache of ``users/{uid}`` documents with write-through updates.
+
+    Code that writes a user document also updates (or invalidates) the cached
+    copy, so reads such as /auth/me and /stats stay consistent with this
+    process's own writes. Entries expire after ``ttl_seconds`` to pick up
+    changes made by other workers.
+    """
+
+    def __init__(self, db, ttl_seconds: float = 300.0, max_entries: int = 10000):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, uid: str) -> Optional[dict]:
+        """Cached user document, reading Firestore on a miss; None if the user does not exist"""
+        entry = self._entries.get(uid)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl_seconds:
+            self._entries.move_to_end(uid)
+            self.hits += 1
+            return None if entry[0] is _MISSING else copy.deepcopy(entry[0])
+
+        self.misses += 1
+        return await self.fetch(uid)
+
+    async def fetch(self, uid: str) -> Optional[dict]:
+        """Read the user document from Firestore and refresh the cached copy"""
+        data = await read_user_document(self.db, uid)
+        self._store(uid, copy.deepcopy(data) if data is not None else _MISSING)
+        return data
+
+    def put(self, uid: str, data: dict):
+        self._store(uid, copy.deepcopy(data))
+
+    def invalidate(self, uid: str):
+        self._entries.pop(uid, None)
+
+    def apply_usage(self, uid: str, action_type: str, count: int = 1, total: Optional[int] = None):
+        """Mirror a usage increment in the cached document; ``total`` defaults to ``count``"""
+        data = self._cached(uid)
+        if data is None or action_type not in USAGE_FIELDS:
+            return
+        total = count if total is None else total
+        if not count and not total:
+            return
+        count_field, total_field = USAGE_FIELDS[action_type]
+        usage = data.setdefault('usage', {})
+        usage[count_field] = usage.get(count_field, 0) + count
+        data[total_field] = data.get(total_field, 0) + total
+
+    def reset_usage(self, uid: str, last_reset: datetime):
+        """Mirror a monthly usage reset in the cached document"""
+        data = self._cached(uid)
+        if data is None:
+            return
+        usage = data.setdefault('usage', {})
+        for count_field, _ in USAGE_FIELDS.values():
+            usage[count_field] = 0
+        usage['lastReset'] = last_reset
+
+    def set_plan(self, uid: str, plan: str):
+        data = self._cached(uid)
+        if data is not None:
+            data['plan'] = plan
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _cached(self, uid: str) -> Optional[dict]:
+        entry = self._entries.get(uid)
+        if entry is None or entry[0] is _MISSING:
+            return None
+        return entry[0]
+
+    def _store(self, uid: str, data):
+        self._entries[uid] = (data, time.monotonic())
+        self._entries.move_to_end(uid)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -1,15 +1,21 @@
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
-from typing import Optional, Dict, List
+from typing import Optional, List
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 from models.models import GrammarError
 import re
 import os
+import json
+import base64
 from dotenv import load_dotenv
 from firebase_admin import auth as firebase_auth
 from google.cloud import firestore
+from utils.decoding import DECODING_PROFILES
+from utils.metrics import timed_firestore
+from utils.revocation import LocalRevocationStore
+from utils.user_cache import read_user_document
 import logging
 
 load_dotenv()
@@ -36,16 +42,37 @@ FREE_PLAN_LIMITS = {
     "grammar": 30
 }
 
-# In-memory revoked token store
-revoked_refresh_tokens: Dict[str, datetime] = {}
+# History list pages carry at most this many characters of each text
+HISTORY_SNIPPET_CHARS = 200
+HISTORY_MAX_PAGE_SIZE = 100
 
-# Firestore client (will be set from run.py)
+# Decoding profiles each plan may request; the first one is the plan default
+PLAN_DECODING_PROFILES = {
+    "free": ["fast", "balanced"],
+    "premium": ["quality", "balanced", "fast"]
+}
+
+# Revoked refresh token ids; run.py swaps in a shared backend when configured
+revocation_store = LocalRevocationStore()
+
+# Firestore client, optional write-behind queue, quota manager and profile cache (will be set from run.py)
 db = None
+history_writer = None
+quota_manager = None
+profile_cache = None
 
-def set_firestore_client(firestore_client):
-    """Set the Firestore client from main app"""
-    global db
+def set_firestore_client(firestore_client, writer=None, quotas=None, profiles=None):
+    """Set the Firestore client (plus history write-behind queue, quota manager and profile cache) from main app"""
+    global db, history_writer, quota_manager, profile_cache
     db = firestore_client
+    history_writer = writer
+    quota_manager = quotas
+    profile_cache = profiles
+
+def set_revocation_store(store):
+    """Set the refresh token revocation store from main app"""
+    global revocation_store
+    revocation_store = store
 
 # ============================
 # JWT Helpers
@@ -86,19 +113,31 @@ def verify_access_token(credentials: HTTPAuthorizationCredentials = Depends(secu
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid access token")
 
-def verify_refresh_token(refresh_token: str) -> dict:
+async def verify_refresh_token(refresh_token: str) -> dict:
     try:
         payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-        if payload.get("type") != "refresh":
-            raise HTTPException(status_code=401, detail="Invalid token type")
-        jti = payload.get("jti")
-        if jti in revoked_refresh_tokens:
-            raise HTTPException(status_code=401, detail="Reused or revoked refresh token")
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Refresh token expired")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    
+    if payload.get("type") != "refresh":
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    jti = payload.get("jti")
+    if not jti or await revocation_store.is_revoked(jti):
+        raise HTTPException(status_code=401, detail="Reused or revoked refresh token")
+    return payload
+
+async def revoke_refresh_token(refresh_token: str):
+    """Revoke a refresh token until it expires; invalid tokens are ignored"""
+    try:
+        payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return  # expired or bad tokens cannot be used anyway
+    
+    jti = payload.get("jti")
+    if jti and payload.get("exp"):
+        await revocation_store.revoke(jti, int(payload["exp"]))
 
 async def verify_firebase_token(firebase_token: str) -> dict:
     try:
@@ -118,10 +157,11 @@ async def verify_firebase_token(firebase_token: str) -> dict:
 # Firestore Helper Functions
 # ============================
 
+@timed_firestore
 async def get_or_create_user(user_data: dict) -> dict:
     """Get user from Firestore or create if doesn't exist"""
     user_ref = db.collection('users').document(user_data['uid'])
-    user_doc = user_ref.get()
+    user_doc = await user_ref.get()
     
     if not user_doc.exists:
         # Create new user
@@ -138,29 +178,75 @@ async def get_or_create_user(user_data: dict) -> dict:
             'totalParaphrases': 0,
             'totalGrammarChecks': 0
         }
-        user_ref.set(new_user)
+        await user_ref.set(new_user)
+        if quota_manager is not None:
+            quota_manager.invalidate(user_data['uid'])
+        if profile_cache is not None:
+            # createdAt is a server timestamp sentinel until read back
+            profile_cache.invalidate(user_data['uid'])
         logger.info(f"Created new user: {user_data['uid']}")
         return new_user
     
-    return user_doc.to_dict()
+    existing_user = user_doc.to_dict()
+    if profile_cache is not None:
+        profile_cache.put(user_data['uid'], existing_user)
+    return existing_user
+
+async def get_user_profile(uid: str) -> Optional[dict]:
+    """User document from the profile cache when configured; None if the user doesn't exist"""
+    # Only actual Firestore reads are timed; cache hits show in the cache's stats
+    if profile_cache is not None:
+        return await profile_cache.get(uid)
+    
+    return await read_user_document(db, uid)
 
-async def check_usage_limit(uid: str, action_type: str) -> tuple[bool, int]:
+@timed_firestore
+async def set_user_plan(uid: str, plan: str):
+    """Change a user's plan and refresh the cached profile and quota"""
+    await db.collection('users').document(uid).update({'plan': plan})
+    if profile_cache is not None:
+        profile_cache.set_plan(uid, plan)
+    if quota_manager is not None:
+        quota_manager.invalidate(uid)
+
+def resolve_decoding_profile(plan: str, requested: Optional[str] = None) -> str:
+    """Pick the decoding profile for a request: the requested one if the plan allows it, else the plan default"""
+    allowed = PLAN_DECODING_PROFILES.get(plan, PLAN_DECODING_PROFILES['free'])
+    if requested is None:
+        return allowed[0]
+    if requested not in DECODING_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown decoding profile '{requested}'. Choose from: {', '.join(DECODING_PROFILES)}"
+        )
+    if requested not in allowed:
+        raise HTTPException(
+            status_code=403,
+            detail=f"The '{requested}' profile requires a premium plan."
+        )
+    return requested
+
+@timed_firestore
+async def check_usage_limit(uid: str, action_type: str) -> tuple[bool, int, str]:
     """
     Check if user has remaining usage for the action
-    Returns: (can_use: bool, remaining: int)
+    Returns: (can_use: bool, remaining: int, plan: str)
     """
+    if quota_manager is not None:
+        return await quota_manager.check(uid, action_type)
+    
     user_ref = db.collection('users').document(uid)
-    user_doc = user_ref.get()
+    user_doc = await user_ref.get()
     
     if not user_doc.exists:
-        return False, 0
+        return False, 0, 'free'
     
     user_data = user_doc.to_dict()
     plan = user_data.get('plan', 'free')
     
     # Premium users have unlimited access
     if plan == 'premium':
-        return True, -1  # -1 indicates unlimited
+        return True, -1, plan  # -1 indicates unlimited
     
     # Check if usage needs to be reset (monthly)
     usage = user_data.get('usage', {})
@@ -174,71 +260,183 @@ async def check_usage_limit(uid: str, action_type: str) -> tuple[bool, int]:
             
         if days_since_reset >= 30:
             # Reset usage
-            user_ref.update({
+            await user_ref.update({
                 'usage.paraphraseCount': 0,
                 'usage.grammarCheckCount': 0,
                 'usage.lastReset': datetime.utcnow()
             })
             usage['paraphraseCount'] = 0
             usage['grammarCheckCount'] = 0
+            if profile_cache is not None:
+                profile_cache.invalidate(uid)
     
     # Check limits
     if action_type == 'paraphrase':
         current_count = usage.get('paraphraseCount', 0)
         limit = FREE_PLAN_LIMITS['paraphrase']
         remaining = limit - current_count
-        return current_count < limit, remaining
+        return current_count < limit, remaining, plan
     elif action_type == 'grammar':
         current_count = usage.get('grammarCheckCount', 0)
         limit = FREE_PLAN_LIMITS['grammar']
         remaining = limit - current_count
-        return current_count < limit, remaining
+        return current_count < limit, remaining, plan
     
-    return False, 0
+    return False, 0, plan
 
-async def increment_usage(uid: str, action_type: str):
-    """Increment usage count for user"""
-    user_ref = db.collection('users').document(uid)
-    
+def usage_increments(action_type: str) -> dict:
+    """Field transforms that count one more use of an action"""
     if action_type == 'paraphrase':
-        user_ref.update({
+        return {
             'usage.paraphraseCount': firestore.Increment(1),
             'totalParaphrases': firestore.Increment(1)
-        })
+        }
     elif action_type == 'grammar':
-        user_ref.update({
+        return {
             'usage.grammarCheckCount': firestore.Increment(1),
             'totalGrammarChecks': firestore.Increment(1)
-        })
+        }
+    return {}
 
-async def save_paraphrase_history(uid: str, original: str, paraphrased: str, language: str) -> str:
-    """Save paraphrase to history"""
-    paraphrase_ref = db.collection('paraphrases').document()
-    paraphrase_data = {
+def paraphrase_history_doc(
+    paraphrase_id: str,
+    uid: str,
+    original: str,
+    paraphrased: str,
+    language: str,
+    translations: Optional[dict] = None
+) -> dict:
+    doc = {
         'userId': uid,
-        'paraphrase_id':paraphrase_ref.id,
+        'paraphrase_id': paraphrase_id,
         'original': original,
         'paraphrased': paraphrased,
         'language': language,
         'createdAt': firestore.SERVER_TIMESTAMP
     }
-    print(paraphrase_ref.id)
-
-    paraphrase_ref.set(paraphrase_data)
-
-    print(paraphrase_data['paraphrase_id'])
-
-    return paraphrase_ref.id
+    if translations:
+        doc['translations'] = translations
+    return doc
 
-async def save_grammar_history(uid: str, original: str, errors: list, language: str) -> str:
-    """Save grammar check to history"""
-    grammar_ref = db.collection('grammarChecks').document()
-    grammar_data = {
+def grammar_history_doc(uid: str, original: str, errors: list, language: str) -> dict:
+    return {
         'userId': uid,
         'original': original,
         'errors': errors,
+        'errorCount': len(errors),
         'language': language,
         'createdAt': firestore.SERVER_TIMESTAMP
     }
-    grammar_ref.set(grammar_data)
-    return grammar_ref.id
+
+@timed_firestore
+async def record_activity(uid: str, action_type: str, history_ref, history_data: dict) -> str:
+    """Write a history document and the usage increment in one batched commit.
+    
+    With a write-behind queue configured the writes are only buffered here and
+    committed by the queue's flush task, so the caller does not wait on Firestore.
+    With a quota manager the usage increment is counted there instead and
+    reconciled separately.
+    """
+    writes = [("set", history_ref, history_data)]
+    if quota_manager is not None:
+        quota_manager.increment(uid, action_type)
+    else:
+        writes.append(("update", db.collection('users').document(uid), usage_increments(action_type)))
+    if profile_cache is not None:
+        profile_cache.apply_usage(uid, action_type)
+    
+    if history_writer is not None:
+        history_writer.enqueue(writes)
+        return history_ref.id
+    
+    batch = db.batch()
+    for operation, ref, data in writes:
+        if operation == "set":
+            batch.set(ref, data)
+        else:
+            batch.update(ref, data)
+    await batch.commit()
+    return history_ref.id
+
+@timed_firestore
+async def record_paraphrase(
+    uid: str,
+    original: str,
+    paraphrased: str,
+    language: str,
+    translations: Optional[dict] = None
+) -> str:
+    """Save paraphrase to history and count it against the user's usage.
+    
+    ``translations`` maps each language of a multi-language paraphrase to its text.
+    """
+    paraphrase_ref = db.collection('paraphrases').document()
+    paraphrase_data = paraphrase_history_doc(paraphrase_ref.id, uid, original, paraphrased, language, translations)
+    return await record_activity(uid, 'paraphrase', paraphrase_ref, paraphrase_data)
+
+@timed_firestore
+async def record_grammar_check(uid: str, original: str, errors: list, language: str) -> str:
+    """Save grammar check to history and count it against the user's usage"""
+    grammar_ref = db.collection('grammarChecks').document()
+    grammar_data = grammar_history_doc(uid, original, errors, language)
+    return await record_activity(uid, 'grammar', grammar_ref, grammar_data)
+
+# ============================
+# History Pagination
+# ============================
+
+def encode_history_cursor(created_at: datetime, doc_id: str) -> str:
+    """Opaque cursor pointing just after the given history document"""
+    raw = json.dumps({'t': created_at.isoformat(), 'id': doc_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_history_cursor(cursor: str) -> dict:
+    """Cursor values for start_after; raises a 400 for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return {'createdAt': datetime.fromisoformat(data['t']), '__name__': data['id']}
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+
+def snippet(text: Optional[str]) -> Optional[str]:
+    if text is None or len(text) <= HISTORY_SNIPPET_CHARS:
+        return text
+    return text[:HISTORY_SNIPPET_CHARS].rstrip() + '…'
+
+@timed_firestore
+async def history_page(collection: str, uid: str, fields: List[str], limit: int, cursor: Optional[str] = None) -> tuple[list, Optional[str]]:
+    """
+    One page of a user's history, newest first, reading only ``fields``
+    Returns: (documents as (id, data) pairs, cursor for the next page or None)
+    """
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+    query = db.collection(collection)\
+        .where('userId', '==', uid)\
+        .order_by('createdAt', direction=firestore.Query.DESCENDING)\
+        .order_by('__name__', direction=firestore.Query.DESCENDING)\
+        .select(list(dict.fromkeys(fields + ['createdAt'])))
+    if cursor:
+        query = query.start_after(decode_history_cursor(cursor))
+    
+    # One extra document tells whether another page exists
+    docs = [(doc.id, doc.to_dict()) async for doc in query.limit(limit + 1).stream()]
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last_id, last_data = docs[-1]
+        if last_data.get('createdAt'):
+            next_cursor = encode_history_cursor(last_data['createdAt'], last_id)
+    return docs, next_cursor
+
+@timed_firestore
+async def get_history_document(collection: str, uid: str, doc_id: str) -> dict:
+    """Full history document owned by the user; 404 otherwise"""
+    doc = await db.collection(collection).document(doc_id).get()
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="History item not found")
+    data = doc.to_dict()
+    if data.get('userId') != uid:
+        raise HTTPException(status_code=404, detail="History item not found")
+    return data
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger("VakhyaShuddhi")
+
+# Firestore rejects write batches with more than 500 operations
+FIRESTORE_MAX_BATCH_WRITES = 500
+
+# (operation, document reference, data) with operation "set" or "update"
+Write = Tuple[str, Any, dict]
+
+
+class WriteBehindQueue:
+    """Buffers Firestore writes and commits them in batches off the request path.
+
+    ``enqueue`` takes a group of writes that must land in the same commit
+    (e.g. a history document and its usage increment) and returns at once.
+    A background task commits pending groups whenever ``max_batch_size``
+    writes are waiting or every ``flush_interval`` seconds. A failed commit
+    is split in halves until the failing groups are isolated, so the others
+    still land; each failing group is retried with exponential backoff up to
+    ``max_retries`` times and then dropped. At most
+    ``max_pending`` groups are buffered; beyond that the oldest are dropped
+    and counted. ``stop`` drains what is left.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        max_retries: int = 5,
+    ):
+        self.db = db
+        self.max_batch_size = min(max(1, max_batch_size), FIRESTORE_MAX_BATCH_WRITES)
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self.max_retries = max_retries
+
+        self._pending: deque = deque()
+        self._pending_writes = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.flushed_writes = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped_groups = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def enqueue(self, writes: List[Write]):
+        """Buffer a group of writes to be committed together"""
+        if len(self._pending) >= self.max_pending:
+            _, dropped = self._pending.popleft()
+            self._pending_writes -= len(dropped)
+            self.dropped_groups += 1
+            logger.error("History write-behind queue full; dropped oldest pending write group")
+
+        self._pending.append((0, writes))
+        self._pending_writes += len(writes)
+        if self._wakeup is not None and self._pending_writes >= self.max_batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop the flush loop and commit everything still pending"""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"History write-behind drain timed out with {len(self._pending)} groups pending")
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": len(self._pending),
+            "pending_writes": self._pending_writes,
+            "flushes": self.flushes,
+            "flushed_writes": self.flushed_writes,
+            "failed_flushes": self.failed_flushes,
+            "dropped_groups": self.dropped_groups,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+    async def _run(self):
+        delay = self.flush_interval
+        while not (self._stopping and not self._pending):
+            if not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            elif delay > self.flush_interval:
+                # Still back off between failed commits while draining
+                await asyncio.sleep(delay)
+
+            ok = await self._flush_pending()
+            delay = self.flush_interval if ok else min(delay * 2, 30.0)
+
+    async def _flush_pending(self) -> bool:
+        """Commit batches until nothing is pending or a commit fails"""
+        while self._pending:
+            if not await self._flush_once():
+                return False
+        return True
+
+    def _take_batch(self) -> list:
+        groups = []
+        count = 0
+        while self._pending:
+            attempts, writes = self._pending[0]
+            if groups and count + len(writes) > self.max_batch_size:
+                break
+            self._pending.popleft()
+            self._pending_writes -= len(writes)
+            groups.append((attempts, writes))
+            count += len(writes)
+        return groups
+
+    async def _flush_once(self) -> bool:
+        groups = self._take_batch()
+        started = time.perf_counter()
+        failed = await self._commit(groups)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        if not failed:
+            return True
+
+        self.failed_flushes += 1
+        # Put failed groups back at the front in their original order
+        for attempts, writes in reversed(failed):
+            if attempts + 1 > self.max_retries:
+                self.dropped_groups += 1
+                logger.error(f"Dropping history write group after {self.max_retries} retries")
+                continue
+            self._pending.appendleft((attempts + 1, writes))
+            self._pending_writes += len(writes)
+        return False
+
+    async def _commit(self, groups: list) -> list:
+        """Commit groups in one batch; returns the groups that failed on their own"""
+        batch = self.db.batch()
+        for _, writes in groups:
+            for operation, ref, data in writes:
+                if operation == "set":
+                    batch.set(ref, data)
+                else:
+                    batch.update(ref, data)
+
+        try:
+            await batch.commit()
+        except Exception as e:
+            if len(groups) == 1:
+                logger.warning(f"History write group failed: {e}")
+                return groups
+            # One bad group fails the whole batch; bisect so the rest can land
+            logger.warning(f"History flush of {len(groups)} groups failed, splitting: {e}")
+            middle = len(groups) // 2
+            return await self._commit(groups[:middle]) + await self._commit(groups[middle:])
+
+        self.flushes += 1
+        self.flushed_writes += sum(len(writes) for _, writes in groups)
+        return []
@@ -43,7 +43,7 @@ interface ParaphraseActivity extends BaseActivity {
 // Specific type for grammar history
 interface GrammarActivity extends BaseActivity {
   type: 'grammar';
-  errors: any[]; // You could define a stronger 'Error' type here
+  errorCount: number | null; // full errors come from /history/grammar/{id}
 }
 
 // A union type for the combined list
@@ -136,8 +136,8 @@ function Dashboard() {
         ];
         setStats(formattedStats);
 
-        const paraphrases = paraphrasesRes.data;
-        const grammar = grammarRes.data;
+        const paraphrases = paraphrasesRes.data.items;
+        const grammar = grammarRes.data.items;
         
         const combinedActivity = [...paraphrases, ...grammar]
           .sort((a, b) => new Date(b.createdAt).getDate() - new Date(a.createdAt)
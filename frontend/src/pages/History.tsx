@@ -37,11 +37,17 @@ interface ParaphraseActivity extends BaseActivity {
 
 interface GrammarActivity extends BaseActivity {
   type: 'grammar'
-  errors: any[]
+  errorCount: number | null
+  errors?: any[] // only on the detail endpoint
 }
 
 type HistoryItem = ParaphraseActivity | GrammarActivity
 
+interface HistoryPage<T> {
+  items: T[]
+  next_cursor: string | null
+}
+
 function History() {
   const [history, setHistory] = useState<HistoryItem[]>([])
   const [filteredHistory, setFilteredHistory] = useState<HistoryItem[]>([])
@@ -51,6 +57,8 @@ function History() {
   const [filterLanguage, setFilterLanguage] = useState<string>("all")
   const [selectedItem, setSelectedItem] = useState<HistoryItem | null>(null)
   const [viewDialogOpen, setViewDialogOpen] = useState(false)
+  const [cursors, setCursors] = useState<{ paraphrase: string | null, grammar: string | null }>({ paraphrase: null, grammar: null })
+  const [loadingMore, setLoadingMore] = useState(false)
   
   const navigate = useNavigate()
 
@@ -70,14 +78,15 @@ function History() {
         api.get("/history/grammar")
       ])
 
-      const paraphrases = paraphrasesRes.data
-      const grammar = grammarRes.data
+      const paraphrases: HistoryPage<ParaphraseActivity> = paraphrasesRes.data
+      const grammar: HistoryPage<GrammarActivity> = grammarRes.data
 
-      const combined = [...paraphrases, ...grammar]
+      const combined = [...paraphrases.items, ...grammar.items]
         .sort((a, b) => new Date(b.createdAt).getTime() - new Date(a.createdAt).getTime())
 
       setHistory(combined)
       setFilteredHistory(combined)
+      setCursors({ paraphrase: paraphrases.next_cursor, grammar: grammar.next_cursor })
     } catch (error) {
       console.error("Failed to fetch history:", error)
     } finally {
@@ -85,6 +94,38 @@ function History() {
     }
   }
 
+  const loadMore = async () => {
+    setLoadingMore(true)
+    try {
+      const [paraphrasesRes, grammarRes] = await Promise.all([
+        cursors.paraphrase ? api.get("/history/paraphrases", { params: { cursor: cursors.paraphrase } }) : null,
+        cursors.grammar ? api.get("/history/grammar", { params: { cursor: cursors.grammar } }) : null
+      ])
+
+      const paraphrases: HistoryPage<ParaphraseActivity> = paraphrasesRes?.data ?? { items: [], next_cursor: null }
+      const grammar: HistoryPage<GrammarActivity> = grammarRes?.data ?? { items: [], next_cursor: null }
+
+      const combined = [...history, ...paraphrases.items, ...grammar.items]
+        .sort((a, b) => new Date(b.createdAt).getTime() - new Date(a.createdAt).getTime())
+
+      setHistory(combined)
+      setCursors({ paraphrase: paraphrases.next_cursor, grammar: grammar.next_cursor })
+    } catch (error) {
+      console.error("Failed to fetch more history:", error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
+  // List pages only carry snippets; the full item comes from the detail endpoint
+  const fetchDetail = async (item: HistoryItem): Promise<HistoryItem> => {
+    const endpoint = item.type === 'paraphrase'
+      ? `/history/paraphrases/${item.id}`
+      : `/history/grammar/${item.id}`
+    const res = await api.get(endpoint)
+    return res.data
+  }
+
   const filterResults = () => {
     let filtered = history
 
@@ -133,16 +174,34 @@ function History() {
     // You could add a toast notification here
   }
 
-  const handleView = (item: HistoryItem) => {
-    setSelectedItem(item)
-    setViewDialogOpen(true)
+  const handleView = async (item: HistoryItem) => {
+    try {
+      setSelectedItem(await fetchDetail(item))
+      setViewDialogOpen(true)
+    } catch (error) {
+      console.error("Failed to fetch item:", error)
+    }
   }
 
-  const handleEdit = (item: HistoryItem) => {
-  if (item.type === 'paraphrase') {
-    navigate('/paraphrase', { state: { text: item.original, language: item.language } })
-  } else {
-    navigate('/grammar', { state: { text: item.original, language: item.language } })
+  const handleCopyItem = async (item: HistoryItem) => {
+    try {
+      const full = await fetchDetail(item)
+      handleCopy(full.type === 'paraphrase' ? full.paraphrased : full.original)
+    } catch (error) {
+      console.error("Failed to fetch item:", error)
+    }
+  }
+
+  const handleEdit = async (item: HistoryItem) => {
+  try {
+    const full = await fetchDetail(item)
+    if (full.type === 'paraphrase') {
+      navigate('/paraphrase', { state: { text: full.original, language: full.language } })
+    } else {
+      navigate('/grammar', { state: { text: full.original, language: full.language } })
+    }
+  } catch (error) {
+    console.error("Failed to fetch item:", error)
   }
 }
 
@@ -151,7 +210,7 @@ function History() {
       type: item.type,
       language: item.language,
       original: item.original,
-      result: item.type === 'paraphrase' ? item.paraphrased : `${item.errors.length} errors found`,
+      result: item.type === 'paraphrase' ? item.paraphrased : `${item.errorCount ?? 'Unknown number of'} errors found`,
       date: item.createdAt
     }))
 
@@ -359,9 +418,9 @@ function History() {
                             </p>
                           )}
 
-                          {item.type === 'grammar' && (
+                          {item.type === 'grammar' && item.errorCount !== null && (
                             <p className="text-sm font-medium mb-3">
-                              {item.errors.length} grammar {item.errors.length === 1 ? 'issue' : 'issues'} found
+                              {item.errorCount} grammar {item.errorCount === 1 ? 'issue' : 'issues'} found
                             </p>
                           )}
 
@@ -380,9 +439,7 @@ function History() {
                               className="cursor-pointer"
                               size="sm"
                               variant="ghost"
-                              onClick={() => handleCopy(
-                                item.type === 'paraphrase' ? item.paraphrased : item.original
-                              )}
+                              onClick={() => handleCopyItem(item)}
                             >
                               <Copy className="h-4 w-4 mr-1" />
                               Copy
@@ -411,6 +468,16 @@ function History() {
                     </CardContent>
                   </Card>
                 ))}
+                {(cursors.paraphrase || cursors.grammar) && (
+                  <Button
+                    variant="outline"
+                    className="w-full cursor-pointer"
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                  >
+                    {loadingMore ? "Loading..." : "Load more"}
+                  </Button>
+                )}
               </div>
             )}
           </div>
@@ -467,7 +534,7 @@ function History() {
                 <div>
                   <h4 className="text-sm font-semibold mb-2">Grammar Issues</h4>
                   <div className="space-y-2">
-                    {selectedItem.errors.length === 0 ? (
+                    {!selectedItem.errors || selectedItem.errors.length === 0 ? (
                       <p className="text-sm text-muted-foreground">No grammar issues found!</p>
                     ) : (
                       selectedItem.errors.map((error, idx) => (